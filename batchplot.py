@@ -0,0 +1,59 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import plotfunc
+from export import export_plot
+
+# plot functions that can be rendered in batch
+PLOTS = list(plotfunc.PRESETS)
+
+
+def _init_worker():
+    # non-interactive backend, nothing is ever shown
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(plot, well, df, path, dpi, style, cache):
+    path, seconds, cached = export_plot(df, well, plot, path, dpi=dpi, style=style, cache=cache)
+    return well, plot, path, seconds, cached
+
+
+# cache: skip wells whose data, plot and style are unchanged since the last export
+def plot_wells(df, plot, wells='all', out_dir='.', fmt='png', dpi=100, n_jobs=None,
+               style=None, cache=False):
+    if plot not in PLOTS:
+        raise ValueError('unknown plot %r, expected one of %s' % (plot, PLOTS))
+
+    if wells is None or wells == 'all':
+        wells = df['Well'].unique()
+    else:
+        wells = list(wells)
+        missing = set(wells) - set(df['Well'].unique())
+        if missing:
+            raise KeyError('wells not in data: %s' % sorted(missing))
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # group once, each worker only receives its own well
+    groups = df[df['Well'].isin(wells)].groupby('Well', sort=False)
+    jobs = [(plot, well, group, os.path.join(out_dir, '%s_%s.%s' % (well, plot, fmt)), dpi,
+             style, cache)
+            for well, group in groups]
+
+    start = time.perf_counter()
+    if n_jobs == 1:
+        results = [_render(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker) as pool:
+            futures = [pool.submit(_render, *job) for job in jobs]
+            results = [future.result() for future in futures]
+    total = time.perf_counter() - start
+
+    timings = pd.DataFrame(results, columns=['Well', 'Plot', 'Path', 'Seconds', 'Cached'])
+    timings.attrs['total_seconds'] = total
+
+    return timings
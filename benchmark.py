@@ -0,0 +1,238 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures, PowerTransformer
+
+import plotfunc
+from cleaning import LogCleaner
+from knnindex import KNNIndex
+from rendering import managed_figure
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+PLOTS = list(plotfunc.PRESETS)
+
+FEATURES = ['GR', 'RS', 'RD', 'NPHI', 'RHOB', 'DTCO', 'DTSM']
+
+# curve generator: start, random walk step, clip range
+CURVE_MODEL = {
+    'GR': (60, 3.0, (5, 250)),
+    'RS': (1.0, 0.03, (-1, 4)),     # log10 ohm.m
+    'RD': (1.0, 0.03, (-1, 4)),
+    'NPHI': (20, 0.8, (0, 60)),
+    'RHOB': (2.45, 0.01, (1.9, 2.95)),
+    'DTCO': (80, 1.0, (45, 140)),
+    'DTSM': (140, 2.0, (80, 300)),
+}
+
+# label column -> number of classes
+LABELS = {'Facies': 6, 'Electrofacies': 5, 'Environment': 6, 'Gas': 2}
+PREDICTIONS = {'Facies_pred': 'Facies', 'Ef_pred': 'Electrofacies',
+               'Env_pred': 'Environment', 'Gas_pred': 'Gas'}
+
+
+# blocky labels, runs of geometric length like the facies columns
+def _runs(rng, n, n_classes, mean_length):
+    lengths = rng.geometric(1.0 / mean_length, size=n // mean_length + 2)
+    while lengths.sum() < n:
+        lengths = np.r_[lengths, rng.geometric(1.0 / mean_length, size=len(lengths))]
+    return np.repeat(rng.randint(0, n_classes, len(lengths)), lengths)[:n]
+
+
+# one well with the columns of ef_train.csv plus the label and prediction columns of b1
+def synthetic_well(n, well='SYN-1', step=0.1524, seed=0, null_rate=0.001):
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({'Depth': 2000 + np.arange(n) * step, 'Well': well})
+    bounds = np.linspace(0, n, 6).astype(int)
+    df['Formation'] = np.repeat(['Fm %d' % i for i in range(5)], np.diff(bounds))
+
+    for curve, (start, walk, (lo, hi)) in CURVE_MODEL.items():
+        values = np.clip(start + np.cumsum(rng.randn(n) * walk), lo, hi)
+        if curve in ('RS', 'RD'):
+            values = 10 ** values
+        values[rng.rand(n) < null_rate] = -999.25
+        df[curve] = values
+
+    for column, n_classes in LABELS.items():
+        df[column] = _runs(rng, n, n_classes, 20)
+    for column, label in PREDICTIONS.items():
+        # predictions agree with the labels most of the time
+        noise = rng.rand(n) < 0.2
+        df[column] = np.where(noise, rng.randint(0, LABELS[label], n), df[label])
+
+    return df
+
+
+# the preprocessing of the notebooks: impute, degree 2 poly, Yeo-Johnson
+def preprocessing():
+    num = Pipeline([('imputer', SimpleImputer(strategy='median')),
+                    ('poly', PolynomialFeatures(2)),
+                    ('transformer', PowerTransformer())])
+    return ColumnTransformer([('numeric', num, FEATURES)])
+
+
+def _models(seed=0):
+    train = LogCleaner(spikes=None).fit_transform(synthetic_well(20000, seed=seed + 1))
+    X, y = train[FEATURES], train['Electrofacies']
+    knn = Pipeline([('prep', preprocessing()), ('algo', KNeighborsClassifier(15))]).fit(X, y)
+    rf = Pipeline([('prep', preprocessing()),
+                   ('algo', RandomForestClassifier(100, max_depth=12, n_jobs=-1, random_state=seed))]).fit(X, y)
+    return knn, rf
+
+
+# wall time of the fastest run, then a second run under tracemalloc for
+# peak traced memory and the allocated blocks the call left behind
+def measure(fn, repeat=1):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    return {'seconds': min(times), 'peak_mb': peak / 1e6, 'retained_blocks': blocks}
+
+
+# lod: draw through the output-resolution path (plot_layout dpi=), otherwise every
+# sample is drawn like the notebooks do; the png has the same size either way
+def _render(df, plot, dpi, lod=True):
+    with managed_figure(plotfunc.PRESETS[plot]['figsize'], dpi) as fig:
+        plotfunc.plot_layout(df, 'SYN-1', plotfunc.PRESETS[plot], show=False,
+                             dpi=dpi if lod else None, fig=fig)
+        fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+
+
+# benchmark name -> function of the synthetic well
+def benchmarks(groups=None, dpi=100):
+    knn, rf = _models()
+    index = KNNIndex.from_pipeline(knn)
+    cleaner = LogCleaner().fit(synthetic_well(20000, seed=1))
+    prep = knn[:-1]
+
+    benches = {
+        'load': {'read_csv': lambda df, path: pd.read_csv(path)},
+        'clean': {'clean': lambda df, path: cleaner.transform(df)},
+        'preprocess': {'transform': lambda df, path: prep.transform(df[FEATURES])},
+        'predict': {'knn': lambda df, path: knn.predict(df[FEATURES]),
+                    'knn_index': lambda df, path: index.predict(df[FEATURES]),
+                    'rf': lambda df, path: rf.predict(df[FEATURES])},
+        'plot': {plot: (lambda df, path, plot=plot: _render(df, plot, dpi)) for plot in PLOTS},
+    }
+    benches['plot'].update({plot + '_full': (lambda df, path, plot=plot: _render(df, plot, dpi, lod=False))
+                            for plot in PLOTS})
+    groups = groups or list(benches)
+
+    return {'%s:%s' % (group, name): fn
+            for group in groups for name, fn in benches[group].items()}
+
+
+def run(sizes=SIZES[:4], groups=None, dpi=100, repeat=3, verbose=True):
+    matplotlib.use('Agg')
+    benches = benchmarks(groups, dpi)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            df = synthetic_well(size)
+            clean = LogCleaner(spikes=None).fit_transform(df)
+            path = os.path.join(tmp, 'well_%d.csv' % size)
+            df.to_csv(path, index=False)
+
+            for name, fn in benches.items():
+                data = df if name.startswith(('load', 'clean')) else clean
+                row = {'bench': name, 'size': size}
+                row.update(measure(lambda: fn(data, path), repeat if size <= 10 ** 5 else 1))
+                results.append(row)
+                if verbose:
+                    print('%-24s %9d %9.4f s %9.1f MB %9d blocks'
+                          % (name, size, row['seconds'], row['peak_mb'], row['retained_blocks']))
+
+    return results
+
+
+def save(results, path):
+    meta = {'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'matplotlib': matplotlib.__version__,
+            'sklearn': sklearn.__version__, 'machine': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ratio of every measurement to the baseline, flags what got slower or bigger than tolerance
+# min_seconds: slowdowns smaller than this are timer noise, not regressions
+def compare(results, baseline, tolerance=0.25, min_seconds=0.05):
+    if isinstance(baseline, str):
+        baseline = load(baseline)
+    base = pd.DataFrame(baseline['results']).set_index(['bench', 'size'])
+    new = pd.DataFrame(results).set_index(['bench', 'size'])
+
+    both = new.join(base, rsuffix='_base', how='inner')
+    report = pd.DataFrame({
+        'seconds': both['seconds'], 'seconds_base': both['seconds_base'],
+        'time_ratio': both['seconds'] / both['seconds_base'],
+        'peak_mb': both['peak_mb'], 'peak_mb_base': both['peak_mb_base'],
+        'memory_ratio': both['peak_mb'] / both['peak_mb_base'].where(both['peak_mb_base'] > 0),
+    })
+    slower = (report['time_ratio'] > 1 + tolerance) & (both['seconds'] - both['seconds_base'] > min_seconds)
+    report['regression'] = slower | (report['memory_ratio'] > 1 + tolerance)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark the plotting and prediction hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES[:4])
+    parser.add_argument('--only', nargs='+', choices=['load', 'clean', 'preprocess', 'predict', 'plot'])
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--min-seconds', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only, args.dpi, args.repeat)
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        report = compare(results, args.compare, args.tolerance, args.min_seconds)
+        print(report.to_string(float_format='%.3f'))
+        if report['regression'].any():
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from profiling import count, profiled
+
+# null values written by the loggers
+SENTINELS = [-999.25, -999.0, -9999.0]
+
+# physical ranges of the curves
+BOUNDS = {
+    'GR': (0, 500),          # API
+    'RS': (0.01, 100000),    # ohm.m
+    'RD': (0.01, 100000),    # ohm.m
+    'NPHI': (-15, 100),      # pu
+    'RHOB': (1.0, 3.2),      # g/cc
+    'DTCO': (40, 240),       # us/f
+    'DTSM': (60, 600),       # us/f
+}
+
+# log-normal curves, spikes are measured on log10 values
+LOG_CURVES = ['RS', 'RD']
+
+
+class LogCleaner:
+    # spikes: 'mad' (robust z-score), 'percentile' or None
+    def __init__(self, curves=None, sentinels=None, bounds=None, spikes='mad',
+                 threshold=8.0, percentiles=(0.1, 99.9)):
+        if spikes not in ('mad', 'percentile', None):
+            raise ValueError("spikes must be 'mad', 'percentile' or None, got %r" % spikes)
+
+        self.curves = curves
+        self.sentinels = sentinels
+        self.bounds = bounds
+        self.spikes = spikes
+        self.threshold = threshold
+        self.percentiles = percentiles
+
+    def _curves(self, df):
+        if self.curves is not None:
+            return list(self.curves)
+        bounds = BOUNDS if self.bounds is None else self.bounds
+        return [c for c in df.columns if c in bounds]
+
+    # float32 curve matrix with sentinel and out of range masks
+    def _masks(self, df, curves):
+        X = df[curves].to_numpy(dtype=np.float32, copy=True)
+        missing = np.isnan(X)
+
+        # per-curve sentinel lists, padded with NaN so they compare as a block
+        sentinels = self.sentinels if self.sentinels is not None else {}
+        lists = [sentinels.get(c, SENTINELS) if isinstance(sentinels, dict) else sentinels
+                 for c in curves]
+        table = np.full((len(curves), max([len(s) for s in lists] + [1])), np.nan, dtype=np.float32)
+        for i, s in enumerate(lists):
+            table[i, :len(s)] = s
+        sentinel = (X[:, :, None] == table[None]).any(axis=2)
+
+        bounds = BOUNDS if self.bounds is None else self.bounds
+        lo = np.array([bounds.get(c, (-np.inf, np.inf))[0] for c in curves], dtype=np.float32)
+        hi = np.array([bounds.get(c, (-np.inf, np.inf))[1] for c in curves], dtype=np.float32)
+        with np.errstate(invalid='ignore'):
+            out_of_range = ~sentinel & ((X < lo) | (X > hi))
+
+        X[sentinel | out_of_range] = np.nan
+
+        return X, missing, sentinel, out_of_range
+
+    @staticmethod
+    def _spike_scale(X, curves):
+        log = [i for i, c in enumerate(curves) if c in LOG_CURVES]
+        if not log:
+            return X
+        X = X.copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            X[:, log] = np.log10(X[:, log])
+        return X
+
+    # spike limits from the training curves
+    def fit(self, df):
+        curves = self._curves(df)
+        X = self._spike_scale(self._masks(df, curves)[0], curves)
+
+        if self.spikes == 'mad':
+            center = np.nanmedian(X, axis=0)
+            scale = 1.4826 * np.nanmedian(np.abs(X - center), axis=0)
+            lo, hi = center - self.threshold * scale, center + self.threshold * scale
+        elif self.spikes == 'percentile':
+            lo, hi = np.nanpercentile(X, self.percentiles, axis=0)
+        else:
+            lo = np.full(len(curves), -np.inf)
+            hi = np.full(len(curves), np.inf)
+
+        self.curves_ = curves
+        self.spike_limits_ = pd.DataFrame({'low': lo, 'high': hi}, index=curves)
+
+        return self
+
+    # fitted curves that df does not have are skipped, e.g. RS/RD on env_train
+    @profiled('clean')
+    def transform(self, df):
+        curves = [c for c in self.curves_ if c in df.columns]
+        X, missing, sentinel, out_of_range = self._masks(df, curves)
+
+        lo = self.spike_limits_.loc[curves, 'low'].to_numpy(dtype=np.float32)
+        hi = self.spike_limits_.loc[curves, 'high'].to_numpy(dtype=np.float32)
+        Y = self._spike_scale(X, curves)
+        with np.errstate(invalid='ignore'):
+            spike = (Y < lo) | (Y > hi)
+        X[spike] = np.nan
+
+        self.report_ = pd.DataFrame({'missing': missing.sum(axis=0),
+                                     'sentinel': sentinel.sum(axis=0),
+                                     'out_of_range': out_of_range.sum(axis=0),
+                                     'spike': spike.sum(axis=0),
+                                     'valid': (~np.isnan(X)).sum(axis=0)}, index=curves)
+
+        df = df.copy()
+        df[curves] = X
+        count('rows_cleaned', len(df))
+
+        return df
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+# clean a frame in place of df.replace([...], np.nan), returns the mask report too
+def clean_logs(df, **kwargs):
+    cleaner = LogCleaner(**kwargs)
+    df = cleaner.fit_transform(df)
+
+    return df, cleaner.report_
@@ -0,0 +1,140 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import ConnectionPatch
+
+from lod import build_pyramids
+from plotfunc import CLASSES, class_track, curve_spec, curve_track
+from wellindex import formation_intervals
+from wellstats import axis_limits, curve_stats, well_stats
+
+# class column -> CLASSES target
+CLASS_COLUMNS = {
+    'Facies': 'litho', 'Facies_pred': 'litho',
+    'Electrofacies': 'ef', 'Ef_pred': 'ef',
+    'Environment': 'env', 'Env_pred': 'env',
+    'Gas': 'gas', 'Gas_pred': 'gas',
+}
+
+
+# first top of every formation in every well, optionally relative to a datum formation
+def well_tops(df, datum=None):
+    tops = formation_intervals(df).groupby(['Well', 'Formation'], sort=False)['Top'].min()
+    shifts = None
+    if datum is not None:
+        shifts = tops.xs(datum, level='Formation')
+        missing = set(df['Well'].unique()) - set(shifts.index)
+        if missing:
+            raise ValueError('datum %r is missing in wells %s' % (datum, sorted(missing)))
+        tops = tops - shifts.reindex(tops.index.get_level_values('Well')).to_numpy()
+
+    return tops, shifts
+
+
+# pyramid queries in datum-shifted depth
+class _ShiftedPyramids:
+    def __init__(self, pyramids, shift):
+        self.pyramids = pyramids
+        self.shift = shift
+
+    def query(self, column, top, base, pixels):
+        depth, values = self.pyramids.query(column, top + self.shift, base + self.shift, pixels)
+        return depth - self.shift, values
+
+
+# wells side by side on one depth axis, tie lines between matching formation tops
+# datum: formation name, every well is flattened on its top
+# dpi: draw curves from min/max pyramids at that resolution
+# robust: curve scales from percentiles instead of min/max, see plotfunc.plot_layout
+# version: data version for the statistics cache, see plotfunc.plot_layout
+def correlation_panel(df, wells=None, curves=('GR',), classes=None, datum=None,
+                      track_width=1.0, height=12, dpi=None, show=True, robust=False, version=None):
+    wells = list(df['Well'].unique()) if wells is None else list(wells)
+    df = df[df['Well'].isin(wells)]
+    if classes is None:
+        classes = [c for c in ['Facies', 'Electrofacies', 'Environment', 'Gas'] if c in df]
+    curves, classes = list(curves), list(classes)
+    n_tracks = len(curves) + len(classes)
+    if n_tracks == 0:
+        raise ValueError('nothing to draw, give curves or class columns')
+
+    tops, shifts = well_tops(df, datum)
+
+    # one scale per curve for all wells, only min/max unless cached or robust
+    if version is None and not robust:
+        stats = curve_stats(df, curves, percentiles=())
+    else:
+        stats = well_stats(df, tuple(wells), version, curves)
+    limits = axis_limits(stats, curves, robust)
+    lod = build_pyramids(df, curves) if dpi is not None and curves else None
+
+    # a narrow spacer column between wells carries the tie lines
+    ratios = []
+    for i in range(len(wells)):
+        ratios += [1] * n_tracks + ([0.6] if i < len(wells) - 1 else [])
+    fig, ax = plt.subplots(1, len(ratios), sharey=True, squeeze=False,
+                           figsize=(track_width * sum(ratios) + 1, height),
+                           gridspec_kw=dict(width_ratios=ratios, wspace=0.08))
+    ax = ax[0]
+
+    groups = df.groupby('Well', sort=False)
+    top, bottom = np.inf, -np.inf
+    blocks = []
+    for i, well in enumerate(wells):
+        group = groups.get_group(well)
+        if shifts is not None:
+            group = group.assign(Depth=group['Depth'] - shifts[well])
+        top, bottom = min(top, group['Depth'].min()), max(bottom, group['Depth'].max())
+
+        axes = ax[i * (n_tracks + 1):i * (n_tracks + 1) + n_tracks]
+        blocks.append(axes)
+        well_top, well_bottom = group['Depth'].max(), group['Depth'].min()
+        for axis, column in zip(axes, curves):
+            spec = curve_spec(column)
+            if lod is None:
+                curve_track(axis, group, spec, well_top, well_bottom, limits[column])
+            else:
+                pixels = int(np.ceil(axis.get_position().height * height * dpi))
+                well_lod = lod[well] if shifts is None else _ShiftedPyramids(lod[well], shifts[well])
+                curve_track(axis, group, spec, well_top, well_bottom, limits[column], well_lod, pixels)
+            axis.set_xlabel(column, fontsize=8)
+            axis.tick_params(labelsize=7)
+        for axis, column in zip(axes[len(curves):], classes):
+            target = CLASSES[CLASS_COLUMNS.get(column, column)]
+            # pixels of the whole axis, the well spans at most that
+            pixels = None if dpi is None else int(np.ceil(axis.get_position().height * height * dpi))
+            class_track(axis, group['Depth'], group[column], target['cmap'], 0, target['vmax'], pixels)
+            axis.set_xlabel(column, fontsize=8)
+            axis.xaxis.set_label_position('top')
+            axis.set_xticks([])
+
+        # formation tops across the tracks of the well
+        for depth in tops.loc[well]:
+            for axis in axes:
+                axis.axhline(depth, color='k', lw=0.8)
+        axes[0].set_title(well, loc='left', fontsize=11, pad=18)
+
+    for spacer in ax[n_tracks::n_tracks + 1]:
+        spacer.axis('off')
+
+    # tie lines from the last track of a well to the first track of the next one
+    for i in range(len(wells) - 1):
+        left, right = tops.loc[wells[i]], tops.loc[wells[i + 1]]
+        for formation in left.index.intersection(right.index):
+            tie = ConnectionPatch(xyA=(1, left[formation]), coordsA=blocks[i][-1].get_yaxis_transform(),
+                                  xyB=(0, right[formation]), coordsB=blocks[i + 1][0].get_yaxis_transform(),
+                                  color='k', lw=0.8, ls='--')
+            fig.add_artist(tie)
+
+    # the depth axis is shared, limits are set once
+    ax[0].set_ylim(bottom, top)
+    ax[0].set_ylabel('Depth (m)' if datum is None else 'Depth below %s top (m)' % datum)
+    fig.suptitle('Correlation %s' % ' - '.join(wells), fontsize=14)
+
+    if not show:
+        return fig
+
+    plt.show()
+    # same as plot_layout, an interactive backend keeps the figure open
+    if not plt.isinteractive():
+        plt.close(fig)
+
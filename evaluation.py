@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import make_scorer
+
+# actual class column -> prediction column
+PAIRS = {
+    'Facies': 'Facies_pred',
+    'Electrofacies': 'Ef_pred',
+    'Environment': 'Env_pred',
+    'Gas': 'Gas_pred',
+}
+
+# samples a prediction may sit off a class boundary in the plotted report
+REPORT_TOLERANCE = 1
+
+
+def _labels(df, actual, pred):
+    y_true = df[actual].to_numpy(dtype=float)
+    y_pred = df[pred].to_numpy(dtype=float)
+    valid = ~(np.isnan(y_true) | np.isnan(y_pred))
+    return y_true[valid].astype(np.int64), y_pred[valid].astype(np.int64), valid
+
+
+# confusion matrices of every group from one bincount, shape (groups, classes, classes),
+# rows are the actual class and columns the predicted one
+def grouped_confusion(y_true, y_pred, groups=None, n_classes=None):
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    if len(y_true) and min(y_true.min(), y_pred.min()) < 0:
+        raise ValueError('class labels must be non-negative integers')
+    k = max(n_classes or 0, int(max(y_true.max(initial=-1), y_pred.max(initial=-1))) + 1)
+    groups = np.zeros(len(y_true), dtype=np.int64) if groups is None else np.asarray(groups)
+    n_groups = int(groups.max(initial=-1)) + 1
+
+    flat = (groups * k + y_true) * k + y_pred
+    return np.bincount(flat, minlength=n_groups * k * k).reshape(n_groups, k, k)
+
+
+def confusion_matrix(y_true, y_pred, n_classes=None):
+    return grouped_confusion(y_true, y_pred, None, n_classes)[0]
+
+
+# precision, recall, F1 and support per class of a stack of confusion matrices;
+# a class never seen nor predicted in a group gets NaN and is left out of its macro F1
+def class_scores(cm):
+    cm = np.asarray(cm, dtype=float)
+    tp = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    present = (support > 0) | (predicted > 0)
+    f1 = np.where(present, f1, np.nan)
+
+    return precision, recall, f1, support
+
+
+# mean F1 over the classes present, NaN for a group without samples
+def _macro(f1):
+    present = ~np.isnan(f1)
+    n = present.sum(axis=-1)
+    return np.where(n > 0, np.nansum(f1, axis=-1) / np.maximum(n, 1), np.nan)
+
+
+# a prediction counts as right when it matches the actual class within `tolerance`
+# samples above or below it; labels in depth order, groups (e.g. well codes) stop
+# the comparison at well boundaries
+def tolerant_match(y_true, y_pred, tolerance=1, groups=None):
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    match = y_true == y_pred
+    for shift in range(1, tolerance + 1):
+        if shift >= len(y_true):
+            break
+        above = y_pred[shift:] == y_true[:-shift]
+        below = y_pred[:-shift] == y_true[shift:]
+        if groups is not None:
+            same = groups[shift:] == groups[:-shift]
+            above &= same
+            below &= same
+        match[shift:] |= above
+        match[:-shift] |= below
+
+    return match
+
+
+def _codes(y_true, y_pred):
+    if y_true.dtype.kind in 'iu' and y_pred.dtype.kind in 'iu' and len(y_true) \
+            and min(y_true.min(), y_pred.min()) >= 0:
+        return y_true, y_pred
+    _, codes = np.unique(np.r_[y_true, y_pred], return_inverse=True)
+    return codes[:len(y_true)], codes[len(y_true):]
+
+
+def tolerant_accuracy(y_true, y_pred, tolerance=1, groups=None):
+    return float(tolerant_match(y_true, y_pred, tolerance, groups).mean())
+
+
+# F1 of the predictions with those within tolerance of a matching class moved onto
+# the actual class, so an offset boundary costs nothing; beds no thicker than the
+# tolerance can then be missed without cost, keep it at a sample or two
+def tolerant_f1(y_true, y_pred, tolerance=1, groups=None, average='macro'):
+    y_true, y_pred = _codes(np.asarray(y_true), np.asarray(y_pred))
+    match = tolerant_match(y_true, y_pred, tolerance, groups)
+    _, _, f1, support = class_scores(confusion_matrix(y_true, np.where(match, y_true, y_pred)))
+    if average == 'macro':
+        return float(_macro(f1))
+    if average == 'weighted':
+        present = ~np.isnan(f1)
+        return float(np.sum(f1[present] * support[present]) / max(support.sum(), 1))
+    raise ValueError("average must be 'macro' or 'weighted', got %r" % average)
+
+
+# scikit-learn scorer for GridSearchCV; the rows of a test fold must be one or more
+# whole wells in depth order, like LeaveOneGroupOut over the Well column
+def tolerant_scorer(tolerance=1, average='macro'):
+    return make_scorer(tolerant_f1, tolerance=tolerance, average=average)
+
+
+# one row per group: samples, accuracy and macro F1
+def _group_table(cm, index):
+    _, _, f1, support = class_scores(cm)
+    samples = support.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.trace(cm, axis1=-2, axis2=-1) / samples
+
+    return pd.DataFrame({'samples': samples.astype(int), 'accuracy': accuracy, 'f1_macro': _macro(f1)},
+                        index=index)
+
+
+# group codes of the by columns, factorized once for all targets
+def _group_codes(df, by):
+    return {column: pd.factorize(df[column], sort=False) for column in by if column in df}
+
+
+# scores of one prediction column against its actual column from columns already
+# in df, no model is run; by: columns that get their own accuracy table
+# tolerance: also score with predictions that many samples off a boundary accepted,
+# rows must be in depth order within each well
+def evaluate(df, actual, pred=None, n_classes=None, by=('Well', 'Formation'), groups=None,
+             tolerance=None):
+    pred = pred or PAIRS[actual]
+    y_true, y_pred, valid = _labels(df, actual, pred)
+
+    cm = confusion_matrix(y_true, y_pred, n_classes)
+    precision, recall, f1, support = class_scores(cm)
+    classes = pd.DataFrame({'precision': precision, 'recall': recall, 'f1': f1,
+                            'support': support.astype(int)})
+    classes.index.name = 'class'
+
+    report = {'actual': actual, 'pred': pred,
+              'samples': int(valid.sum()),
+              'accuracy': np.trace(cm) / max(cm.sum(), 1),
+              'f1_macro': float(_macro(f1)),
+              'confusion': pd.DataFrame(cm, index=pd.Index(range(len(cm)), name=actual),
+                                        columns=pd.Index(range(len(cm)), name=pred)),
+              'classes': classes}
+
+    groups = _group_codes(df, by) if groups is None else groups
+    match = None
+    if tolerance:
+        wells = groups['Well'][0] if 'Well' in groups else pd.factorize(df['Well'])[0] if 'Well' in df else None
+        match = tolerant_match(y_true, y_pred, tolerance, None if wells is None else wells[valid])
+        adjusted = np.where(match, y_true, y_pred)
+        _, _, f1_tolerant, _ = class_scores(confusion_matrix(y_true, adjusted, len(cm)))
+        classes['f1_tolerant'] = f1_tolerant
+        report.update(tolerance=tolerance, accuracy_tolerant=float(match.mean()) if len(match) else np.nan,
+                      f1_macro_tolerant=float(_macro(f1_tolerant)))
+
+    for column, (codes, names) in groups.items():
+        codes = codes[valid]
+        keep = codes >= 0
+        grouped = grouped_confusion(y_true[keep], y_pred[keep], codes[keep], len(cm))
+        if len(grouped) < len(names):
+            grouped = np.concatenate([grouped, np.zeros((len(names) - len(grouped),) + cm.shape, int)])
+        table = _group_table(grouped, pd.Index(names, name=column))
+        if match is not None:
+            hits = np.bincount(codes[keep], weights=match[keep], minlength=len(names))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                table['accuracy_tolerant'] = hits / table['samples'].to_numpy()
+        report[column] = table[table['samples'] > 0]
+
+    return report
+
+
+# reports of every actual/prediction pair present in df
+def evaluate_all(df, pairs=None, by=('Well', 'Formation'), tolerance=None):
+    pairs = PAIRS if pairs is None else pairs
+    groups = _group_codes(df, by)
+    return {actual: evaluate(df, actual, pred, groups=groups, tolerance=tolerance)
+            for actual, pred in pairs.items() if actual in df and pred in df}
+
+
+# confusion matrix, per-class F1 and per-formation accuracy of a report stacked
+# in the rectangle (left, bottom, width, height) of a figure
+def draw_report(fig, report, rect, class_names=None):
+    left, bottom, width, height = rect
+    panel = (height - 0.1) / 3
+    cm = report['confusion'].to_numpy()
+    k = len(cm)
+    names = list(class_names or range(k))[:k]
+    names += [str(i) for i in range(len(names), k)]
+
+    # confusion matrix normalised by the actual class, counts written in the cells
+    ax = fig.add_axes([left, bottom + 2 * panel + 0.1, width, panel])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = cm / cm.sum(axis=1, keepdims=True)
+    ax.imshow(np.nan_to_num(rates), cmap='Blues', vmin=0, vmax=1, aspect='auto')
+    for (i, j), n in np.ndenumerate(cm):
+        if n:
+            ax.text(j, i, n, ha='center', va='center', fontsize=7,
+                    color='white' if rates[i, j] > 0.5 else 'black')
+    ax.set_xticks(range(k))
+    ax.set_xticklabels(names, fontsize=7, rotation=90)
+    ax.set_yticks(range(k))
+    ax.set_yticklabels(names, fontsize=7)
+    ax.set_xlabel('Predicted', fontsize=8)
+    ax.set_ylabel('Actual', fontsize=8)
+    title = '%s  accuracy %.2f  F1 %.2f' % (report['actual'], report['accuracy'], report['f1_macro'])
+    if 'accuracy_tolerant' in report:
+        title += '\n\u00b1%d samples: accuracy %.2f  F1 %.2f' % (
+            report['tolerance'], report['accuracy_tolerant'], report['f1_macro_tolerant'])
+    ax.set_title(title, fontsize=9)
+
+    # F1 per class
+    ax = fig.add_axes([left, bottom + panel + 0.05, width, panel - 0.02])
+    f1 = report['classes']['f1'].to_numpy()
+    ax.barh(range(k), np.nan_to_num(f1), color='steelblue')
+    ax.set_yticks(range(k))
+    ax.set_yticklabels(names, fontsize=7)
+    ax.invert_yaxis()
+    ax.set_xlim(0, 1)
+    ax.set_xlabel('F1', fontsize=8)
+    ax.tick_params(axis='x', labelsize=7)
+
+    # accuracy per formation, per well when there is no Formation column
+    table = report.get('Formation', report.get('Well'))
+    ax = fig.add_axes([left, bottom, width, panel - 0.02])
+    if table is not None:
+        ax.barh(range(len(table)), table['accuracy'].to_numpy(), color='darkseagreen')
+        ax.set_yticks(range(len(table)))
+        ax.set_yticklabels(['%s (%d)' % (name, n) for name, n in zip(table.index, table['samples'])],
+                           fontsize=7)
+        ax.invert_yaxis()
+    ax.set_xlim(0, 1)
+    ax.set_xlabel('Accuracy', fontsize=8)
+    ax.tick_params(axis='x', labelsize=7)
+
+    return fig
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import time
+
+import matplotlib
+import pandas as pd
+
+import plotfunc
+from profiling import span
+from rendering import managed_figure
+
+# bump when the drawing code changes in a way the plot spec does not show
+RENDER_VERSION = 1
+
+# cache keys of exported files, next to the exports
+CACHE_DIR = '.plotcache'
+
+
+def _columns(spec, df):
+    columns = ['Depth', 'Well']
+    for track in spec['tracks']:
+        if track['kind'] == 'tops':
+            columns.append('Formation')
+        else:
+            columns.append(track['column'])
+    return [c for c in dict.fromkeys(columns) if c in df]
+
+
+# content hash of everything that ends up in the picture
+def plot_key(df, plot, fmt, dpi, style=None):
+    spec = plotfunc.PRESETS[plot]
+    data = pd.util.hash_pandas_object(df[_columns(spec, df)], index=False).to_numpy()
+
+    h = hashlib.sha1(data.tobytes())
+    h.update(json.dumps([plot, spec, fmt, dpi, style, RENDER_VERSION, matplotlib.__version__],
+                        sort_keys=True, default=str).encode())
+
+    return h.hexdigest()
+
+
+def _key_path(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, name + '.key')
+
+
+def cached(path, key):
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(_key_path(path)) as f:
+            return f.read() == key
+    except OSError:
+        return False
+
+
+# draw and save one plot on an Agg figure outside pyplot, released even when saving fails
+def render(df, well, plot, path, fmt=None, dpi=100, style=None):
+    fmt = fmt or os.path.splitext(path)[1][1:] or 'png'
+    with matplotlib.rc_context(style or {}), \
+            managed_figure(plotfunc.PRESETS[plot]['figsize'], dpi) as fig:
+        getattr(plotfunc, plot)(df, well, show=False, dpi=dpi, fig=fig)
+        with span('plot.save', format=fmt):
+            fig.savefig(path, format=fmt, dpi=dpi)
+
+    return path
+
+
+# export a plot of one well unless an identical one is already on disk
+# returns (path, seconds, cached)
+def export_plot(df, well, plot, path, fmt=None, dpi=100, style=None, cache=True):
+    if plot not in plotfunc.PRESETS:
+        raise ValueError('unknown plot %r, expected one of %s' % (plot, list(plotfunc.PRESETS)))
+
+    start = time.perf_counter()
+    df = df[df['Well'] == well]
+    fmt = fmt or os.path.splitext(path)[1][1:] or 'png'
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    key = plot_key(df, plot, fmt, dpi, style) if cache else None
+    if cache and cached(path, key):
+        return path, time.perf_counter() - start, True
+
+    render(df, well, plot, path, fmt, dpi, style)
+    if cache:
+        os.makedirs(os.path.dirname(_key_path(path)), exist_ok=True)
+        with open(_key_path(path), 'w') as f:
+            f.write(key)
+
+    return path, time.perf_counter() - start, False
@@ -0,0 +1,287 @@
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.neighbors import BallTree, KDTree
+from sklearn.preprocessing import PolynomialFeatures, PowerTransformer
+
+from knnindex import vote
+
+
+# write next to the target and swap it in, memory-mapped readers keep the old file
+def _replace(path, write):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+# count, mean and sum of squares of the non-missing values of each column
+def _batch_moments(X):
+    n_b = (~np.isnan(X)).sum(axis=0)
+    mean_b = np.where(n_b > 0, np.nansum(X, axis=0) / np.maximum(n_b, 1), 0)
+    m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+    return n_b, mean_b, m2_b
+
+
+# per-column count, mean and sum of squares, merged batch by batch (Chan et al.)
+class RunningMoments:
+    def __init__(self, n_features):
+        self.n = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def update(self, X):
+        n_b, mean_b, m2_b = _batch_moments(X)
+
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / np.maximum(n, 1)
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / np.maximum(n, 1)
+        self.n = n
+
+        return self
+
+    # take out a batch merged before, the inverse of update
+    def remove(self, X):
+        n_b, mean_b, m2_b = _batch_moments(X)
+
+        n = self.n - n_b
+        mean = np.where(n > 0, (self.n * self.mean - n_b * mean_b) / np.maximum(n, 1), 0)
+        delta = mean_b - mean
+        self.m2 = np.maximum(self.m2 - m2_b - delta ** 2 * n * n_b / np.maximum(self.n, 1), 0)
+        self.mean = mean
+        self.n = n
+
+        return self
+
+    @property
+    def scale(self):
+        scale = np.sqrt(self.m2 / np.maximum(self.n, 1))
+        return np.where(scale > 0, scale, 1.0)
+
+    def state(self):
+        return {'n': self.n.tolist(), 'mean': self.mean.tolist(), 'm2': self.m2.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(len(state['n']))
+        moments.n, moments.mean, moments.m2 = (np.asarray(state[k]) for k in ('n', 'mean', 'm2'))
+        return moments
+
+
+# KNN model that grows well by well: mean imputation and standard scaling come
+# from running moments, Yeo-Johnson lambdas are frozen at the first well, and
+# every well is an append-only segment of the neighbour index; segments keep
+# their raw rows so that their gaps are imputed again when the means move
+class IncrementalKNN:
+    def __init__(self, columns, poly=None, transform=None, n_neighbors=5, weights='uniform',
+                 p=2, tolerance=0.05):
+        if transform not in (None, 'yeo-johnson'):
+            raise ValueError("transform must be None or 'yeo-johnson', got %r" % transform)
+
+        self.columns = list(columns)
+        self.poly = poly
+        self.transform_ = transform
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.p = p
+        self.tolerance = tolerance
+
+        self.raw = RunningMoments(len(self.columns))
+        self.features = None
+        self.power = None
+        self.classes = None
+        self.segments = []
+        self.versions = []
+
+    @property
+    def wells(self):
+        return [segment['well'] for segment in self.segments]
+
+    # raw curves -> unscaled features
+    def _features(self, X):
+        X = np.asarray(X[self.columns] if hasattr(X, 'columns') else X, dtype=np.float64)
+        X = np.where(np.isnan(X), self.raw.mean, X)
+        if self.poly:
+            X = PolynomialFeatures(self.poly, include_bias=False).fit_transform(X)
+        if self.power is not None:
+            X = self.power.transform(X)
+        return X
+
+    def _scaled(self, Z):
+        return (Z - self.features.mean) / self.features.scale
+
+    def _tree(self, Z):
+        tree_class = KDTree if Z.shape[1] < 16 else BallTree
+        return tree_class(self._scaled(Z), metric='minkowski', p=self.p)
+
+    def _segment(self, well, X, Z, y, saved=False):
+        return {'well': well, 'X': X, 'Z': Z, 'y': y, 'tree': self._tree(Z),
+                'missing': np.isnan(X).any(axis=0), 'impute': self.raw.mean.copy(),
+                'mean': self.features.mean.copy(), 'scale': self.features.scale.copy(),
+                'saved': saved, 'tree_saved': False}
+
+    # add one labelled well, the cost depends on the size of that well only
+    def partial_fit(self, X, y, well):
+        if well in self.wells:
+            raise ValueError('well %r is already in the model' % well)
+
+        X = np.asarray(X[self.columns] if hasattr(X, 'columns') else X, dtype=np.float64)
+        self.raw.update(X)
+        if self.transform_ == 'yeo-johnson' and self.power is None:
+            self.power = PowerTransformer(standardize=False).fit(self._features(X))
+
+        Z = self._features(X)
+        if self.features is None:
+            self.features = RunningMoments(Z.shape[1])
+        self.features.update(Z)
+
+        y = np.asarray(y)
+        self.classes = np.unique(y) if self.classes is None else np.union1d(self.classes, y)
+        self.segments.append(self._segment(well, X, Z, y))
+        self.versions.append({'version': len(self.versions) + 1, 'wells': self.wells,
+                              'n_samples': int(sum(len(s['y']) for s in self.segments)),
+                              'created': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        self.refresh()
+
+        return self
+
+    # how far the scaling of each segment is from the current statistics
+    def drift(self):
+        current_mean, current_scale = self.features.mean, self.features.scale
+        return [float(max(np.max(np.abs(s['mean'] - current_mean) / current_scale),
+                          np.max(np.abs(s['scale'] / current_scale - 1))))
+                for s in self.segments]
+
+    # how far the means the gaps of each segment were filled with are from the current ones
+    def impute_drift(self):
+        current_mean, current_scale = self.raw.mean, self.raw.scale
+        return [float(np.max(np.abs(s['impute'] - current_mean)[s['missing']] / current_scale[s['missing']],
+                             initial=0.0))
+                for s in self.segments]
+
+    # impute again the segments whose fill values moved past the tolerance, then
+    # rebuild those and the segments whose scaling moved past it
+    def refresh(self, tolerance=None):
+        tolerance = self.tolerance if tolerance is None else tolerance
+        imputed = set()
+        for s, d in zip(self.segments, self.impute_drift()):
+            if d > tolerance:
+                Z = self._features(s['X'])
+                self.features.remove(s['Z']).update(Z)
+                s['Z'], s['saved'] = Z, False
+                imputed.add(s['well'])
+
+        rebuilt = []
+        for i, d in enumerate(self.drift()):
+            s = self.segments[i]
+            if d > tolerance or s['well'] in imputed:
+                self.segments[i] = self._segment(s['well'], s['X'], s['Z'], s['y'], s['saved'])
+                rebuilt.append(s['well'])
+        return rebuilt
+
+    # top k over all segments
+    def kneighbors(self, X, k=None):
+        k = k or self.n_neighbors
+        Q = self._features(X)
+        dists, labels = [], []
+        for s in self.segments:
+            Qs = (Q - s['mean']) / s['scale']
+            d, i = s['tree'].query(Qs, k=min(k, len(s['y'])))
+            dists.append(d)
+            labels.append(np.searchsorted(self.classes, np.asarray(s['y'])[i]))
+
+        dist, labels = np.hstack(dists), np.hstack(labels)
+        top = np.argsort(dist, axis=1)[:, :k]
+
+        return np.take_along_axis(dist, top, axis=1), np.take_along_axis(labels, top, axis=1)
+
+    def predict(self, X, chunksize=65536):
+        out = np.empty(len(X), dtype=self.classes.dtype)
+        for start in range(0, len(X), chunksize):
+            chunk = X[start:start + chunksize]
+            dist, labels = self.kneighbors(chunk)
+            codes = np.arange(len(self.classes))
+            out[start:start + len(chunk)] = self.classes[
+                vote(dist, labels, codes, len(self.classes), self.weights)]
+        return out
+
+    # one directory per segment, the manifest records the wells of every version
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        segments = []
+        for i, s in enumerate(self.segments):
+            name = 'segment-%03d' % i
+            seg_path = os.path.join(path, name)
+            os.makedirs(seg_path, exist_ok=True)
+            if not s['saved']:
+                _replace(os.path.join(seg_path, 'X.npy'), lambda f: np.save(f, s['X']))
+                _replace(os.path.join(seg_path, 'Z.npy'), lambda f: np.save(f, s['Z']))
+                _replace(os.path.join(seg_path, 'y.npy'), lambda f: np.save(f, s['y']))
+                s['saved'] = True
+            if not s['tree_saved']:
+                _replace(os.path.join(seg_path, 'tree.joblib'), lambda f: joblib.dump(s['tree'], f))
+                s['tree_saved'] = True
+            segments.append({'well': s['well'], 'path': name,
+                             'mean': s['mean'].tolist(), 'scale': s['scale'].tolist(),
+                             'missing': s['missing'].tolist(), 'impute': s['impute'].tolist()})
+
+        if self.power is not None:
+            _replace(os.path.join(path, 'power.joblib'), lambda f: joblib.dump(self.power, f))
+
+        manifest = {'columns': self.columns, 'poly': self.poly, 'transform': self.transform_,
+                    'n_neighbors': self.n_neighbors, 'weights': self.weights, 'p': self.p,
+                    'tolerance': self.tolerance, 'classes': self.classes.tolist(),
+                    'raw': self.raw.state(), 'features': self.features.state(),
+                    'segments': segments, 'versions': self.versions}
+        _replace(os.path.join(path, 'manifest.json'),
+                 lambda f: f.write(json.dumps(manifest, indent=1).encode()))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+
+        model = cls(manifest['columns'], manifest['poly'], manifest['transform'],
+                    manifest['n_neighbors'], manifest['weights'], manifest['p'],
+                    manifest['tolerance'])
+        model.raw = RunningMoments.from_state(manifest['raw'])
+        model.features = RunningMoments.from_state(manifest['features'])
+        model.classes = np.asarray(manifest['classes'])
+        model.versions = manifest['versions']
+        if manifest['transform']:
+            model.power = joblib.load(os.path.join(path, 'power.joblib'))
+
+        for s in manifest['segments']:
+            seg_path = os.path.join(path, s['path'])
+            model.segments.append({
+                'well': s['well'],
+                'X': np.load(os.path.join(seg_path, 'X.npy'), mmap_mode=mmap_mode),
+                'Z': np.load(os.path.join(seg_path, 'Z.npy'), mmap_mode=mmap_mode),
+                'y': np.load(os.path.join(seg_path, 'y.npy'), mmap_mode=mmap_mode),
+                'tree': joblib.load(os.path.join(seg_path, 'tree.joblib'), mmap_mode=mmap_mode),
+                'missing': np.asarray(s['missing']), 'impute': np.asarray(s['impute']),
+                'mean': np.asarray(s['mean']), 'scale': np.asarray(s['scale']),
+                'saved': True, 'tree_saved': True})
+
+        return model
+
+
+# train from a frame one well at a time, or add the new wells to a saved model
+def fit_wells(df, target, columns, path=None, **kwargs):
+    if path and os.path.exists(os.path.join(path, 'manifest.json')):
+        model = IncrementalKNN.load(path)
+    else:
+        model = IncrementalKNN(columns, **kwargs)
+
+    for well, group in df.groupby('Well', sort=False):
+        if well not in model.wells:
+            model.partial_fit(group, group[target], well)
+
+    if path:
+        model.save(path)
+
+    return model
@@ -0,0 +1,91 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from cleaning import LogCleaner
+from profiling import count, span
+from resample import resample
+
+# prediction column -> saved estimator, as written by jcopml save_model
+MODELS = {
+    'Ef_pred': 'electrofacies.pkl',
+    'Facies_pred': 'lithofacies.pkl',
+    'Env_pred': 'environment.pkl',
+    'Gas_pred': 'gas.pkl',
+}
+
+# columns that are never model inputs
+ID_COLUMNS = ['Depth', 'Well', 'Formation']
+
+
+def load_models(models=None):
+    models = MODELS if models is None else models
+    return {column: joblib.load(m) if isinstance(m, str) else m for column, m in models.items()}
+
+
+def _features(model, df):
+    if hasattr(model, 'feature_names_in_'):
+        return list(model.feature_names_in_)
+    return [c for c in df.columns if c not in ID_COLUMNS]
+
+
+class MultiTargetPredictor:
+    def __init__(self, models=None, cleaner=None):
+        self.models = load_models(models)
+        self.cleaner = cleaner
+
+        # models whose fitted preprocessing is identical share one transform
+        self.groups = {}
+        for column, model in self.models.items():
+            key = joblib.hash(model[:-1]) if hasattr(model, 'steps') else column
+            self.groups.setdefault(key, []).append(column)
+
+    # pass a cleaner fitted on the training data for spike removal; statistics of
+    # the well being predicted would clip its real extremes, so without one only
+    # sentinels and physical ranges apply
+    def clean(self, df):
+        cleaner = self.cleaner or LogCleaner(spikes=None).fit(df)
+        return cleaner.transform(df)
+
+    # all prediction columns, one transform per shared preprocessing per chunk
+    def predict(self, df, chunksize=100000, clean=True):
+        if clean:
+            df = self.clean(df)
+
+        preds = {column: np.empty(len(df), dtype=np.int64) for column in self.models}
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            for columns in self.groups.values():
+                first = self.models[columns[0]]
+                X = chunk[_features(first, chunk)]
+                if hasattr(first, 'steps'):
+                    with span('transform'):
+                        X = first[:-1].transform(X)
+                for column in columns:
+                    model = self.models[column]
+                    algo = model.steps[-1][1] if hasattr(model, 'steps') else model
+                    with span('predict', target=column):
+                        preds[column][start:start + len(chunk)] = algo.predict(X)
+            count('rows_predicted', len(chunk))
+
+        return pd.DataFrame(preds, index=df.index)
+
+    # df with the prediction columns appended, like b1-final.csv
+    # step: put the wells on a regular grid first, e.g. the 0.5 m of the training data
+    def transform(self, df, chunksize=100000, clean=True, step=None):
+        if step is not None:
+            df = resample(df, step)
+        preds = self.predict(df, chunksize, clean)
+        df = df.drop(columns=[c for c in preds.columns if c in df.columns])
+
+        return pd.concat([df, preds], axis=1)
+
+
+def predict_file(csv, out, models=None, cleaner=None, chunksize=100000, index_col=0, step=None):
+    with span('load.csv'):
+        df = pd.read_csv(csv, index_col=index_col)
+    result = MultiTargetPredictor(models, cleaner).transform(df, chunksize, step=step)
+    with span('write.csv'):
+        result.to_csv(out)
+
+    return result
@@ -0,0 +1,281 @@
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+from scipy.spatial.distance import cdist
+from sklearn.neighbors import BallTree, KDTree
+
+
+# class votes of the neighbours, same tie breaking as KNeighborsClassifier;
+# padding (index -1) left by an approximate search gets no weight
+def vote(dist, ind, y, n_classes, weights='uniform'):
+    found = ind >= 0
+    labels = y[np.where(found, ind, 0)]
+    if weights == 'uniform':
+        w = np.ones(labels.shape)
+    elif weights == 'distance':
+        # exact matches take all the weight, like sklearn
+        zero = dist == 0
+        with np.errstate(divide='ignore'):
+            w = np.where(zero.any(axis=1, keepdims=True), zero, 1.0 / dist)
+    else:
+        raise ValueError('unsupported weights %r' % weights)
+    w = np.where(found, w, 0.0)
+
+    n = len(labels)
+    rows = np.arange(n)[:, None] * n_classes
+    counts = np.bincount((rows + labels).ravel(), weights=w.ravel(), minlength=n * n_classes)
+
+    return counts.reshape(n, n_classes).argmax(axis=1)
+
+
+def _distances(A, B, p):
+    if p == 2:
+        return cdist(A, B, 'euclidean')
+    return cdist(A, B, 'minkowski', p=p)
+
+
+# coarse quantizer, a few Lloyd iterations on a sample of the training matrix
+def _kmeans(X, n_lists, n_iter=10, sample=100000, seed=0):
+    rng = np.random.RandomState(seed)
+    if len(X) > sample:
+        X = X[rng.choice(len(X), sample, replace=False)]
+    centroids = X[rng.choice(len(X), n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assign = _distances(X, centroids, 2).argmin(axis=1)
+        counts = np.bincount(assign, minlength=n_lists)
+        for j in range(X.shape[1]):
+            sums = np.bincount(assign, weights=X[:, j], minlength=n_lists)
+            centroids[counts > 0, j] = sums[counts > 0] / counts[counts > 0]
+        # empty lists restart from random samples
+        empty = np.flatnonzero(counts == 0)
+        centroids[empty] = X[rng.choice(len(X), len(empty), replace=False)]
+
+    return centroids
+
+
+# inverted file index: training rows grouped by their nearest centroid,
+# a query only scans the n_probe closest lists (the recall/speed knob)
+class IVFIndex:
+    def __init__(self, X, centroids, offsets, order, p=2, n_probe=8, chunksize=4096):
+        self.X = X
+        self.centroids = centroids
+        self.offsets = offsets
+        self.order = order
+        self.p = p
+        self.n_probe = n_probe
+        self.chunksize = chunksize
+
+    @classmethod
+    def build(cls, X, n_lists=None, p=2, n_probe=8, n_iter=10, seed=0):
+        X = np.asarray(X, dtype=np.float64)
+        n_lists = n_lists or max(1, int(np.sqrt(len(X))))
+        centroids = _kmeans(X, min(n_lists, len(X)), n_iter, seed=seed)
+
+        assign = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), 65536):
+            assign[start:start + 65536] = _distances(X[start:start + 65536], centroids, 2).argmin(axis=1)
+        order = np.argsort(assign, kind='stable')
+        offsets = np.r_[0, np.cumsum(np.bincount(assign, minlength=len(centroids)))]
+
+        return cls(X[order], centroids, offsets, order, p, n_probe)
+
+    def get_arrays(self):
+        return (self.X,)
+
+    def _query(self, Q, k, n_probe):
+        probes = np.argsort(_distances(Q, self.centroids, 2), axis=1)[:, :n_probe]
+
+        # (query, probe) pairs grouped by list
+        flat = probes.ravel()
+        pairs = np.argsort(flat, kind='stable')
+        lists, bounds = np.unique(flat[pairs], return_index=True)
+        bounds = np.r_[bounds, len(pairs)]
+
+        # top k of every probed list, merged once at the end
+        cand_d = np.full((len(Q), n_probe, k), np.inf)
+        cand_i = np.full((len(Q), n_probe, k), -1, dtype=np.int64)
+        for c, lo, hi in zip(lists, bounds[:-1], bounds[1:]):
+            start, stop = self.offsets[c], self.offsets[c + 1]
+            if start == stop:
+                continue
+            qs, slot = np.divmod(pairs[lo:hi], n_probe)
+
+            d = _distances(Q[qs], self.X[start:stop], self.p)
+            kk = min(k, stop - start)
+            if kk < stop - start:
+                top = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+            else:
+                top = np.broadcast_to(np.arange(kk), d.shape)
+            cand_d[qs, slot, :kk] = np.take_along_axis(d, top, axis=1)
+            cand_i[qs, slot, :kk] = start + top
+
+        cand_d = cand_d.reshape(len(Q), -1)
+        cand_i = cand_i.reshape(len(Q), -1)
+        top = np.argsort(cand_d, axis=1)[:, :k]
+
+        return np.take_along_axis(cand_d, top, axis=1), np.take_along_axis(cand_i, top, axis=1)
+
+    # same interface as KDTree.query, indices are rows of the sorted matrix;
+    # queries whose probed lists hold fewer than k rows probe twice as many lists
+    # until they are full, index -1 and distance inf only when X has fewer than k rows
+    def query(self, Q, k=1, n_probe=None):
+        Q = np.asarray(Q, dtype=np.float64)
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        dist, ind = self._chunks(Q, k, n_probe)
+
+        short = np.flatnonzero(ind[:, -1] < 0)
+        while len(short) and n_probe < len(self.centroids):
+            n_probe = min(2 * n_probe, len(self.centroids))
+            dist[short], ind[short] = self._chunks(Q[short], k, n_probe)
+            short = short[ind[short, -1] < 0]
+
+        return dist, ind
+
+    def _chunks(self, Q, k, n_probe):
+        dist = np.empty((len(Q), k))
+        ind = np.empty((len(Q), k), dtype=np.int64)
+        for start in range(0, len(Q), self.chunksize):
+            stop = start + self.chunksize
+            dist[start:stop], ind[start:stop] = self._query(Q[start:stop], k, n_probe)
+
+        return dist, ind
+
+
+class KNNIndex:
+    def __init__(self, tree, y, classes, n_neighbors=5, weights='uniform', prep=None):
+        self.tree = tree
+        self.y = y
+        self.classes = np.asarray(classes)
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.prep = prep
+
+    # transformed training matrix and a spatial index from a fitted prep + knn pipeline
+    # algorithm='ivf' builds the approximate index, tuned by n_probe
+    # X, y: the raw training rows and labels the pipeline was fitted on; without
+    # them the matrix the classifier keeps after fit is used
+    @classmethod
+    def from_pipeline(cls, model, algorithm='auto', leaf_size=40, n_lists=None, n_probe=8,
+                      X=None, y=None):
+        knn = model.steps[-1][1]
+        prep = model[:-1] if len(model.steps) > 1 else None
+        X, y = cls._training_data(knn, prep, X, y)
+        if algorithm == 'ivf':
+            if knn.effective_metric_ not in ('euclidean', 'manhattan', 'minkowski'):
+                raise ValueError('ivf supports minkowski metrics only, got %r' % knn.effective_metric_)
+            p = {'euclidean': 2, 'manhattan': 1}.get(knn.effective_metric_)
+            p = p or knn.effective_metric_params_.get('p', 2)
+            tree = IVFIndex.build(X, n_lists, p, n_probe)
+            return cls(tree, y[tree.order], knn.classes_, knn.n_neighbors, knn.weights, prep)
+
+        if algorithm == 'auto':
+            algorithm = 'kd_tree' if X.shape[1] < 16 else 'ball_tree'
+        tree_class = KDTree if algorithm == 'kd_tree' else BallTree
+
+        # the metric the classifier was fitted with, p=2 minkowski becomes euclidean
+        tree = tree_class(X, leaf_size=leaf_size, metric=knn.effective_metric_,
+                          **knn.effective_metric_params_)
+
+        return cls(tree, y, knn.classes_, knn.n_neighbors, knn.weights, prep)
+
+    # training matrix in the transformed space and labels as positions in classes_
+    @staticmethod
+    def _training_data(knn, prep, X, y):
+        if X is None and y is None:
+            fit_X, fit_y = getattr(knn, '_fit_X', None), getattr(knn, '_y', None)
+            if fit_X is None or fit_y is None:
+                raise ValueError('%s does not expose its training data, pass the training rows '
+                                 'as X and y' % type(knn).__name__)
+            return np.asarray(fit_X, dtype=np.float64), np.asarray(fit_y)
+        if X is None or y is None:
+            raise ValueError('X and y must be passed together')
+
+        X = np.asarray(X if prep is None else prep.transform(X), dtype=np.float64)
+        y = np.asarray(y)
+        codes = np.searchsorted(knn.classes_, y).clip(0, len(knn.classes_) - 1)
+        unknown = knn.classes_[codes] != y
+        if unknown.any():
+            raise ValueError('labels %s are not classes of the model' % np.unique(y[unknown]).tolist())
+        if len(X) != len(y):
+            raise ValueError('X has %d rows but y has %d' % (len(X), len(y)))
+
+        return X, codes
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        joblib.dump(self.tree, os.path.join(path, 'tree.joblib'))
+        np.save(os.path.join(path, 'y.npy'), self.y)
+        if self.prep is not None:
+            joblib.dump(self.prep, os.path.join(path, 'prep.joblib'))
+
+        meta = {'classes': self.classes.tolist(), 'n_neighbors': self.n_neighbors,
+                'weights': self.weights, 'prep': self.prep is not None}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+    # tree arrays and labels are memory-mapped, nothing is rebuilt
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        tree = joblib.load(os.path.join(path, 'tree.joblib'), mmap_mode=mmap_mode)
+        y = np.load(os.path.join(path, 'y.npy'), mmap_mode=mmap_mode)
+        prep = joblib.load(os.path.join(path, 'prep.joblib')) if meta['prep'] else None
+
+        return cls(tree, y, meta['classes'], meta['n_neighbors'], meta['weights'], prep)
+
+    @property
+    def X(self):
+        return self.tree.get_arrays()[0]
+
+    def transform(self, X):
+        return X if self.prep is None else self.prep.transform(X)
+
+    def kneighbors(self, Xt, k=None):
+        return self.tree.query(Xt, k=k or self.n_neighbors)
+
+    # batched predict over a whole well, X in the raw feature space
+    def predict(self, X, chunksize=65536, transformed=False):
+        out = np.empty(len(X), dtype=self.classes.dtype)
+        for start in range(0, len(X), chunksize):
+            chunk = X[start:start + chunksize]
+            Xt = chunk if transformed else self.transform(chunk)
+            dist, ind = self.kneighbors(Xt)
+            out[start:start + len(Xt)] = self.classes[
+                vote(dist, ind, self.y, len(self.classes), self.weights)]
+
+        return out
+
+
+# approximate vs exact index on a held-out well: prediction agreement,
+# neighbour recall and query time
+def agreement(approx, exact, X, transformed=False):
+    Xt = X if transformed else exact.transform(X)
+
+    start = time.perf_counter()
+    exact_dist, exact_ind = exact.kneighbors(Xt)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx_dist, approx_ind = approx.kneighbors(Xt)
+    approx_time = time.perf_counter() - start
+
+    n_classes = len(exact.classes)
+    exact_pred = vote(exact_dist, exact_ind, exact.y, n_classes, exact.weights)
+    approx_pred = vote(approx_dist, approx_ind, approx.y, n_classes, approx.weights)
+
+    # share of the exact neighbours found, in original training row numbers;
+    # padding stays -1 and so never matches
+    if hasattr(approx.tree, 'order'):
+        approx_ind = np.where(approx_ind >= 0, approx.tree.order[np.maximum(approx_ind, 0)], -1)
+    found = (exact_ind[:, :, None] == approx_ind[:, None, :]).any(axis=2)
+
+    return {'agreement': float((exact_pred == approx_pred).mean()),
+            'recall': float(found.mean()),
+            'exact_seconds': exact_time,
+            'approx_seconds': approx_time}
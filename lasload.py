@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from profiling import count, profiled
+
+# depth mnemonics used by the logging contractors
+DEPTH_NAMES = {'DEPT': 'Depth', 'DEPTH': 'Depth', 'MD': 'Depth'}
+
+
+# header line: MNEM.UNIT  DATA : DESCRIPTION
+def _header_line(line):
+    name, _, rest = line.partition('.')
+    unit, _, rest = rest.partition(' ')
+    data, _, _ = rest.rpartition(':')
+    return name.strip(), unit.strip(), data.strip()
+
+
+# read the ~V, ~W and ~C sections, leave the file at the first data line
+def read_las_header(f):
+    header = {'well': None, 'null': -999.25, 'curves': [], 'units': [], 'wrap': False}
+    section = None
+
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError('no ~A section in LAS file')
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('~'):
+            section = line[1].upper()
+            if section == 'A':
+                break
+            continue
+
+        name, unit, data = _header_line(line)
+        if section == 'V' and name.upper() == 'WRAP':
+            header['wrap'] = data.upper() == 'YES'
+        elif section == 'W' and name.upper() == 'NULL':
+            header['null'] = float(data)
+        elif section == 'W' and name.upper() == 'WELL':
+            header['well'] = data
+        elif section == 'C':
+            header['curves'].append(name)
+            header['units'].append(unit)
+
+    if header['wrap']:
+        raise ValueError('wrapped LAS files are not supported')
+
+    return header
+
+
+# null values and out of range samples to NaN (or clamped), one pass over the chunk
+def _clean(values, null, lo, hi, outliers):
+    values[values == null] = np.nan
+    if outliers == 'clip':
+        np.clip(values, lo, hi, out=values)
+    else:
+        with np.errstate(invalid='ignore'):
+            values[(values < lo) | (values > hi)] = np.nan
+
+    return values
+
+
+# stream the curve data of a LAS 2.0 file in fixed-size chunks
+def iter_las(path, chunksize=100000, bounds=None, outliers='nan', as_frame=True, rename=None):
+    if outliers not in ('nan', 'clip'):
+        raise ValueError("outliers must be 'nan' or 'clip', got %r" % outliers)
+
+    rename = dict(DEPTH_NAMES, **(rename or {}))
+    bounds = bounds or {}
+
+    with open(path) as f:
+        header = read_las_header(f)
+        names = [rename.get(c.upper(), rename.get(c, c)) for c in header['curves']]
+
+        # per-curve bounds as arrays so a chunk is cleaned in one vectorised pass
+        lo = np.array([bounds.get(c, (-np.inf, np.inf))[0] for c in names])
+        hi = np.array([bounds.get(c, (-np.inf, np.inf))[1] for c in names])
+
+        reader = pd.read_csv(f, sep=r'\s+', header=None, names=names, dtype=np.float64,
+                             chunksize=chunksize, comment='#')
+        for chunk in reader:
+            values = _clean(chunk.to_numpy(), header['null'], lo, hi, outliers)
+            count('rows_loaded', len(values))
+            if not as_frame:
+                yield values
+                continue
+
+            frame = pd.DataFrame(values.astype(np.float32), columns=names, index=chunk.index)
+            if 'Depth' in frame:
+                frame['Depth'] = values[:, names.index('Depth')]
+            frame.insert(1 if 'Depth' in frame else 0, 'Well', header['well'])
+            yield frame
+
+
+@profiled('load.las')
+def read_las(path, **kwargs):
+    return pd.concat(iter_las(path, **kwargs), ignore_index=True)
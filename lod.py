@@ -0,0 +1,74 @@
+import numpy as np
+
+# samples merged per step of the pyramid
+FACTOR = 4
+
+
+def _blocks(a, factor, fill):
+    pad = -len(a) % factor
+    return np.r_[a, np.full(pad, fill)].reshape(-1, factor)
+
+
+# min and max of a curve over blocks of 4, 16, 64, ... samples, the level drawn
+# is the coarsest one that still has a block for every pixel row
+class MinMaxPyramid:
+    def __init__(self, depth, values, factor=FACTOR, min_blocks=256):
+        self.depth = np.asarray(depth, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.factor = factor
+
+        self.levels = []
+        top, base, v_min, v_max = self.depth, self.depth, self.values, self.values
+        size = 1
+        while len(v_min) > min_blocks * factor:
+            top = _blocks(top, factor, np.nan)[:, 0]
+            base = np.fmax.reduce(_blocks(base, factor, np.nan), axis=1)
+            # fmin/fmax skip NaNs, an all-NaN block stays a gap
+            v_min = np.fmin.reduce(_blocks(v_min, factor, np.nan), axis=1)
+            v_max = np.fmax.reduce(_blocks(v_max, factor, np.nan), axis=1)
+            size *= factor
+            self.levels.append((size, top, base, v_min, v_max))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for level in self.levels for a in level[1:])
+
+    # line vertices between top and base for an axis that is `pixels` tall
+    def query(self, top, base, pixels):
+        lo = max(np.searchsorted(self.depth, top, side='left') - 1, 0)
+        hi = np.searchsorted(self.depth, base, side='right') + 1
+        samples = hi - lo
+
+        for size, b_top, b_base, v_min, v_max in reversed(self.levels):
+            if size * pixels <= samples:
+                lo = max(np.searchsorted(b_base, top) - 1, 0)
+                hi = np.searchsorted(b_top, base, side='right') + 1
+                depth = np.column_stack([b_top[lo:hi], b_base[lo:hi]]).ravel()
+                values = np.column_stack([v_min[lo:hi], v_max[lo:hi]]).ravel()
+                return depth, values
+
+        return self.depth[lo:hi], self.values[lo:hi]
+
+
+# pyramids of every curve of one well
+class WellPyramids:
+    def __init__(self, df, columns, factor=FACTOR):
+        df = df.sort_values('Depth')
+        depth = df['Depth'].to_numpy(dtype=np.float64)
+        self.top, self.base = depth[0], depth[-1]
+        self.curves = {column: MinMaxPyramid(depth, df[column], factor) for column in columns}
+
+    def __getitem__(self, column):
+        return self.curves[column]
+
+    def __contains__(self, column):
+        return column in self.curves
+
+    def query(self, column, top, base, pixels):
+        return self.curves[column].query(top, base, pixels)
+
+
+# one WellPyramids per well from a single groupby
+def build_pyramids(df, columns=None, factor=FACTOR):
+    columns = columns or [c for c in ['GR', 'RS', 'RD', 'NPHI', 'RHOB', 'DTCO', 'DTSM'] if c in df]
+    return {well: WellPyramids(group, columns, factor) for well, group in df.groupby('Well', sort=False)}
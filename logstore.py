@@ -0,0 +1,124 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+# dictionary encoded columns, everything else is numeric
+CATEGORICAL = ['Well', 'Formation']
+
+
+# convert a well log csv once into a directory of .npy columns
+@profiled('load.build_store')
+def build_store(csv, path, index_col=None):
+    df = pd.read_csv(csv, index_col=index_col)
+    df = df.sort_values(['Well', 'Depth'], kind='mergesort').reset_index(drop=True)
+
+    os.makedirs(path, exist_ok=True)
+    meta = {'source': os.path.abspath(csv), 'mtime': os.path.getmtime(csv),
+            'columns': [], 'categories': {}, 'wells': {}}
+
+    for column in df.columns:
+        values = df[column]
+        if column in CATEGORICAL:
+            codes, categories = pd.factorize(values)
+            values = codes.astype(np.int32)
+            meta['categories'][column] = [str(c) for c in categories]
+        elif column == 'Depth':
+            values = values.to_numpy(dtype=np.float64)
+        elif pd.api.types.is_integer_dtype(values):
+            values = values.to_numpy()
+        else:
+            # curves, and label columns with gaps
+            values = values.to_numpy(dtype=np.float32)
+        np.save(os.path.join(path, '%s.npy' % column), values)
+        meta['columns'].append(column)
+
+    # per-well row offsets into the sorted columns
+    well = df['Well'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, well[1:] != well[:-1]])
+    stops = np.r_[starts[1:], len(well)]
+    for start, stop in zip(starts, stops):
+        meta['wells'][str(well[start])] = [int(start), int(stop)]
+
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+
+    return LogStore(path)
+
+
+class LogStore:
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        self.path = path
+        self.meta = meta
+        self.categories = meta['categories']
+        self.offsets = meta['wells']
+        self.columns = {c: np.load(os.path.join(path, '%s.npy' % c), mmap_mode='r')
+                        for c in meta['columns']}
+
+    def __len__(self):
+        return len(self.columns['Depth'])
+
+    # changes whenever the store is rebuilt from a changed csv, a data version
+    # for the curve statistics cache (plot_layout(..., version=store.version))
+    @property
+    def version(self):
+        return '%s@%r' % (self.meta['source'], self.meta['mtime'])
+
+    @property
+    def wells(self):
+        return list(self.offsets)
+
+    # row range of a well, optionally narrowed to a depth window
+    def rows(self, well, top=None, base=None):
+        if well not in self.offsets:
+            raise KeyError('well %r not in store' % well)
+
+        start, stop = self.offsets[well]
+        if top is None and base is None:
+            return start, stop
+
+        depth = self.columns['Depth'][start:stop]
+        lo = 0 if top is None else np.searchsorted(depth, top, side='left')
+        hi = len(depth) if base is None else np.searchsorted(depth, base, side='right')
+
+        return start + lo, start + hi
+
+    # zero-copy column views of a well or a depth window
+    def well(self, well, top=None, base=None, columns=None):
+        start, stop = self.rows(well, top, base)
+        columns = columns or list(self.columns)
+
+        return {c: self.columns[c][start:stop] for c in columns}
+
+    # pandas frame over the memory-mapped columns, curves are not copied
+    def frame(self, well=None, top=None, base=None, columns=None):
+        columns = columns or list(self.columns)
+        if well is None:
+            data = {c: self.columns[c] for c in columns}
+        else:
+            data = self.well(well, top, base, columns)
+
+        for c in CATEGORICAL:
+            if c in data:
+                data[c] = pd.Categorical.from_codes(data[c], self.categories[c])
+
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+
+# open the store next to a csv, building it on first use or when the csv changed
+@profiled('load.store')
+def load_logs(csv, path=None, index_col=None):
+    path = path or os.path.splitext(csv)[0] + '.store'
+    meta = os.path.join(path, 'meta.json')
+    if os.path.exists(meta):
+        store = LogStore(path)
+        if store.meta['mtime'] == os.path.getmtime(csv):
+            return store
+
+    return build_store(csv, path, index_col)
@@ -2,1181 +2,426 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
+from matplotlib import cm
+from matplotlib.collections import PolyCollection
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
-# modified from Brendon Hall Github
+from evaluation import PAIRS, REPORT_TOLERANCE, draw_report, evaluate
+from lod import WellPyramids
+from profiling import count, profiled
+from resample import resample_well
+from wellindex import WellIndex
+
+
+# run-length encode a class column into depth intervals
+def class_runs(depth, labels):
+    depth = np.asarray(depth, dtype=float)
+    labels = np.asarray(labels, dtype=float)
+    n = len(labels)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    # every sample covers the depth halfway to its neighbours
+    edges = np.empty(n + 1)
+    edges[1:-1] = (depth[1:] + depth[:-1]) / 2
+    half = (depth[1] - depth[0]) / 2 if n > 1 else 0.25
+    edges[0] = depth[0] - half
+    edges[-1] = depth[-1] + ((depth[-1] - depth[-2]) / 2 if n > 1 else half)
+
+    # a run starts wherever the label changes, missing labels form their own runs
+    nan = np.isnan(labels)
+    change = (labels[1:] != labels[:-1]) & ~(nan[1:] & nan[:-1])
+    starts = np.flatnonzero(np.r_[True, change])
+    stops = np.r_[starts[1:], n]
+
+    return edges[starts], edges[stops], labels[starts]
+
+
+# vertices of one rectangle across the track (x 0 to 1) per run
+def strip_verts(top, base):
+    verts = np.empty((len(top), 4, 2))
+    verts[:, :, 0] = [0, 1, 1, 0]
+    verts[:, :2, 1] = np.asarray(top)[:, None]
+    verts[:, 2:, 1] = np.asarray(base)[:, None]
+    return verts
+
+
+# runs between depths lo and hi drawn on `pixels` pixels: with more runs than pixels,
+# every pixel takes the run under its centre and neighbouring pixels of the same
+# class merge, so there are never more strips than pixels
+# top, base, values: runs without missing labels, in depth order
+def pixel_runs(top, base, values, lo, hi, pixels):
+    first, last = np.searchsorted(base, lo), np.searchsorted(top, hi, side='right')
+    if last - first <= pixels:
+        return top[first:last], base[first:last], values[first:last]
+
+    height = (hi - lo) / pixels
+    centres = lo + (np.arange(pixels) + 0.5) * height
+    runs = np.searchsorted(top, centres, side='right') - 1
+    inside = (runs >= 0) & (base[runs.clip(0)] > centres)
+    pixel = np.where(inside, values[runs.clip(0)], np.nan)
+
+    nan = np.isnan(pixel)
+    change = (pixel[1:] != pixel[:-1]) & ~(nan[1:] & nan[:-1])
+    starts = np.flatnonzero(np.r_[True, change])
+    stops = np.r_[starts[1:], pixels]
+    keep = ~nan[starts]
+    starts, stops = starts[keep], stops[keep]
+
+    return lo + starts * height, lo + stops * height, pixel[starts]
+
+
+# draw a class track as one filled strip per run instead of an N x 100 image
+# pixels: height of the track in output pixels, runs thinner than a pixel are merged
+def class_track(ax, depth, labels, cmap, vmin, vmax, pixels=None):
+    top, base, values = class_runs(depth, labels)
+    keep = ~np.isnan(values)
+    top, base, values = top[keep], base[keep], values[keep]
+    if pixels is not None and len(depth):
+        top, base, values = pixel_runs(top, base, values, np.nanmin(depth), np.nanmax(depth), pixels)
+
+    norm = colors.Normalize(vmin=vmin, vmax=vmax)
+    strips = PolyCollection(strip_verts(top, base), facecolors=cmap(norm(values)),
+                            edgecolors='none', antialiaseds=False)
+    ax.add_collection(strips)
+    ax.set_xlim(0, 1)
+    if len(depth):
+        ax.set_ylim(np.nanmax(depth), np.nanmin(depth))
+
+    # mappable for the colour bar, same norm as the old imshow
+    im = cm.ScalarMappable(norm=norm, cmap=cmap)
+    im.set_array(np.asarray([]))
+
+    return im
 
-# lithofacies classifier plot
-def lithoplot_data(df, well):
-    df = df[df['Well'] == well]
 
-    # lithofacies color map
-    # color order = [0, 1, 2, 3, ...]
-    litho_colors = ['mediumseagreen', 'orange', 'yellow', 'saddlebrown', 'grey', 'cyan']
-    cmap_litho = colors.ListedColormap(litho_colors)  # make color into colormap
+# modified from Brendon Hall Github
 
-    cluster = np.repeat(np.expand_dims(df.Facies, 1), 100, 1)
+# class color maps
+# color order = [0, 1, 2, 3, ...]
+litho_colors = ['mediumseagreen', 'orange', 'yellow', 'saddlebrown', 'grey', 'cyan']
+ef_colors = ['red', 'green', 'blue', 'yellow', 'cyan']
+env_colors = ['saddlebrown', 'yellowgreen', 'turquoise', 'darkgreen', 'grey', 'blue']
+gas_colors = ['blue', 'yellow']
+
+# class targets: colormap, upper bound of the color norm and color bar label
+CLASSES = {
+    'litho': dict(cmap=colors.ListedColormap(litho_colors), vmax=6,
+                  label=(30 * ' ').join(['Si ', 'VSiS', 'SiSs', 'SiCl', 'Cl', 'SiSsCt'])),
+    'ef': dict(cmap=colors.ListedColormap(ef_colors), vmax=4,
+               label=(40 * ' ').join(['Cy', 'Fu', 'Be', 'SI', 'Sy'])),
+    'env': dict(cmap=colors.ListedColormap(env_colors), vmax=6,
+                label=(30 * ' ').join(['MoS ', 'Sh', 'MI', 'ImS', 'Ind', 'Ma'])),
+    'gas': dict(cmap=colors.ListedColormap(gas_colors), vmax=1,
+                label=(85 * ' ').join(['Low', 'Average'])),
+}
+
+# log curves: axis label and line color
+CURVES = {
+    'GR': dict(label='Gamma Ray (API)', color='g'),
+    'RHOB': dict(label='Density (g/cc)', color='r'),
+    'NPHI': dict(label='NPHI (.pu)', color='black'),
+    'DTCO': dict(label='DTCO (us/f)', color='blue'),
+    'DTSM': dict(label='DTSM (us/f)', color='red'),
+}
+
+# inches added to the right of a layout for its evaluation report
+REPORT_WIDTH = 5
+
+WELL_CURVES = ['GR', 'RHOB', 'NPHI', 'DTCO', 'DTSM']
+TEST_CURVES = ['GR', 'RHOB', 'NPHI', 'DTCO']
+
+
+# track specs
+def tops_spec():
+    return dict(kind='tops')
+
+
+def curve_spec(column, label=None, color=None):
+    curve = CURVES.get(column, {})
+    return dict(kind='curve', column=column,
+                label=label or curve.get('label', column),
+                color=color or curve.get('color', 'k'))
+
+
+def class_spec(column, target, label, colorbar=True):
+    return dict(kind='class', column=column, target=target, label=label, colorbar=colorbar)
+
+
+def layout(tracks, figsize, savefig=None):
+    return dict(tracks=tracks, figsize=figsize, savefig=savefig)
+
+
+@profiled('plot.tops')
+def _tops_track(ax, fm_tops, top, bottom):
+
+    ax.set_xlabel('Tops ', fontsize = '12' )
+    ax.set_ylabel('Measured Depth (m) ', fontsize = '12' )
+    ax.set_xticklabels([])
+    ax.set_xticks([])
+    ax.set_facecolor('#ffffed')
+    ax.set_xlim(0, 1)
+    ax.set_ylim(bottom, top)
+    ax.xaxis.set_label_position("top")
+    ax.invert_yaxis()
+    ax.hlines(fm_tops['Top'], 0.06, 0.95, color = 'k', lw = 1, ls = '-', alpha = 0.9)
+    for Top, MD in zip(fm_tops['Formation'], fm_tops['Top']):
+        ax.text(x = 0.45,  y = MD, s = Top , fontsize = '9',
+                horizontalalignment = 'center', verticalalignment = 'top')
+
+
+# one curve track from a curve_spec, xlim as (min, max); lod/pixels draw the
+# min/max envelope of a WellPyramids instead of every sample
+@profiled('plot.curve')
+def curve_track(ax, df, spec, top, bottom, xlim, lod=None, pixels=None):
+    if lod is None:
+        ax.plot(df[spec['column']], df.Depth, c=spec['color'])
+    else:
+        # min/max envelope at the output resolution instead of every sample
+        depth, values = lod.query(spec['column'], bottom, top, pixels)
+        ax.plot(values, depth, c=spec['color'])
+    ax.set_xlabel(spec['label'])
+    ax.set_ylim(top, bottom)
+    ax.set_xlim(*xlim)
+    ax.grid()
+    ax.xaxis.set_label_position('top')
+    ax.xaxis.set_ticks_position('top')
+
+
+@profiled('plot.class')
+def _class_track(ax, df, spec, cax=None, pixels=None):
+    target = CLASSES[spec['target']]
+    im = class_track(ax, df.Depth, df[spec['column']], target['cmap'], 0, target['vmax'], pixels)
+    ax.set_xlabel(spec['label'])
+    ax.xaxis.set_label_position('top')
+    ax.xaxis.set_ticks_position('top')
+    ax.set_xticks([])
+    ax.set_yticklabels([])
+
+    # a reused figure keeps its colour bar, it is the same for every well
+    if spec['colorbar'] and cax is None:
+        divider = make_axes_locatable(ax)
+        cax = divider.append_axes("right", size="20%", pad=0.05)
+        cbar = ax.figure.colorbar(im, cax=cax)
+        cbar.set_label(target['label'])
+        cbar.set_ticks(range(0, 1))
+        cbar.set_ticklabels('')
+
+
+# confusion matrix, class F1 and formation accuracy of every actual/predicted
+# pair of class tracks, right of the tracks
+def _report_panels(fig, df, tracks, figsize):
+    columns = [track['column'] for track in tracks if track['kind'] == 'class']
+    pairs = [(track, PAIRS[track['column']]) for track in tracks
+             if track['kind'] == 'class' and PAIRS.get(track['column']) in columns]
+    if not pairs:
+        raise ValueError('report needs an actual and a predicted class track, like the *_val plots')
+
+    right = 0.9 * (figsize[0] - REPORT_WIDTH) / figsize[0]
+    fig.subplots_adjust(right=right)
+    left = right + 1.4 / figsize[0]
+    width = (0.97 - left) / len(pairs)
+    for i, (track, pred) in enumerate(pairs):
+        report = evaluate(df, track['column'], pred, tolerance=REPORT_TOLERANCE)
+        draw_report(fig, report, (left + i * width, 0.11, width - 0.01, 0.77),
+                    CLASSES[track['target']]['label'].split())
+
+
+# draw a well from a list of track specs
+# dpi: output resolution, curves are then drawn from a min/max pyramid (lod: build_pyramids)
+# and class runs thinner than a pixel are merged
+# fig: draw into this figure, its axes are reused when it already holds the same layout
+# step: resample the well to this depth spacing first, any input spacing is drawn as is
+# df can also be a WellIndex or one of its windows, e.g. index.formation('Plover Fm'),
+# then nothing is filtered or rescanned and the curve scales are those of the whole well
+# robust: curve scales from the 1st to 99th percentile (or a (low, high) pair) so that
+# a single spike does not squash the track
+# version: token that changes with the data, e.g. LogStore.version, the curve statistics
+# are then cached per well and version; 'hash' hashes the curves instead
+# report: confusion matrix and scores of the actual/predicted class tracks next to them,
+# computed from the columns already in df
+@profiled('plot')
+def plot_layout(df, well, spec, show=True, dpi=None, lod=None, fig=None, step=None, robust=False,
+                report=False, version=None):
+    tracks = spec['tracks']
+    curves = list(CURVES) + [track['column'] for track in tracks
+                             if track['kind'] == 'curve' and track['column'] not in CURVES]
+    if step is not None and version is not None:
+        version = (version, step)
+    if isinstance(df, WellIndex):
+        index = df if step is None else WellIndex(resample_well(df.frame, step), version=version,
+                                                  curves=curves)
+    elif step is not None:
+        index = WellIndex(resample_well(df[df['Well'] == well], step), version=version, curves=curves)
+    else:
+        index = WellIndex(df, well, version, curves)
+    df = index.frame
 
     # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
+    top = index.base
+    bottom = index.top
 
-    # plotting
-    fig, ax = plt.subplots(1, 7, figsize=(20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
-
-    # lithofacies
-    im = ax[6].imshow(cluster, interpolation='none', aspect='auto',
-                      cmap=cmap_litho, vmin=0, vmax=6)
-    ax[6].set_xlabel('Lithofacies')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[6])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((30 * ' ').join(['Si ', 'VSiS', 'SiSs',
-                                    'SiCl', 'Cl', 'SiSsCt']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
+    # curve axis limits from the statistics cache
+    limits = index.limits if not robust else index.curve_limits(robust=robust)
 
-    # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
-
-    plt.show()
-
-
-def lithoplot_val(df, well):
-    df = df[df['Well'] == well]
-
-    # lithofacies color map
-    litho_colors = ['mediumseagreen', 'orange', 'yellow', 'saddlebrown', 'grey', 'cyan']
-    cmap_litho = colors.ListedColormap(litho_colors)  # make color into colormap
-
-    cluster1 = np.repeat(np.expand_dims(df.Facies, 1), 100, 1)
-    cluster2 = np.repeat(np.expand_dims(df.Facies_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
+    if dpi is not None:
+        curves = [track['column'] for track in tracks if track['kind'] == 'curve']
+        lod = lod[index.well] if lod is not None else WellPyramids(df, curves)
 
     # plotting
-    fig, ax = plt.subplots(1, 8, figsize=(20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
-
-    # actual lithofacies
-    im = ax[6].imshow(cluster1, interpolation='none', aspect='auto',
-                      cmap=cmap_litho, vmin=0, vmax=6)
-    ax[6].set_xlabel('Actual Lithofacies')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-    # predicted lithofacies
-    im = ax[7].imshow(cluster2, interpolation='none', aspect='auto',
-                      cmap=cmap_litho, vmin=0, vmax=6)
-    ax[7].set_xlabel('Predicted Lithofacies')
-    ax[7].xaxis.set_label_position('top')
-    ax[7].xaxis.set_ticks_position('top')
-    ax[7].set_xticks([])
-    ax[7].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[7])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((30 * ' ').join(['Si ', 'VSiS', 'SiSs',
-                                    'SiCl', 'Cl', 'SiSsCt']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
+    figsize = spec['figsize']
+    if report:
+        figsize = (figsize[0] + REPORT_WIDTH, figsize[1])
+    if fig is None:
+        fig, ax = plt.subplots(1, len(tracks), figsize=figsize)
+        caxes = []
+    elif getattr(fig, 'track_layout', None) is spec and not report:
+        ax, caxes = fig.axes[:len(tracks)], fig.axes[len(tracks):]
+        for axis in ax:
+            axis.cla()
+    else:
+        fig.clear()
+        fig.set_size_inches(figsize)
+        ax, caxes = fig.subplots(1, len(tracks)), []
+    # report axes are not part of the layout, such a figure is rebuilt next time
+    fig.track_layout = spec if not report else None
+    ax = np.atleast_1d(ax)
+    caxes = iter(caxes)
+    depth_axis = None
+
+    for axis, track in zip(ax, tracks):
+        # track height in output pixels
+        pixels = None if dpi is None else int(np.ceil(axis.get_position().height * spec['figsize'][1] * dpi))
+        if track['kind'] == 'tops':
+            _tops_track(axis, index.intervals, top, bottom)
+            depth_axis = axis
+        elif track['kind'] == 'curve':
+            column = track['column']
+            if dpi is None:
+                curve_track(axis, df, track, top, bottom, limits[column])
+            else:
+                curve_track(axis, df, track, top, bottom, limits[column], lod, pixels)
+            if depth_axis is None:
+                axis.set_ylabel('Depth (m)')
+                depth_axis = axis
+            else:
+                axis.set_yticklabels([])
+        elif track['kind'] == 'class':
+            _class_track(axis, df, track, next(caxes, None) if track['colorbar'] else None, pixels)
+        else:
+            raise ValueError('unknown track kind %r' % track['kind'])
+
+    if report:
+        _report_panels(fig, df, tracks, figsize)
+
+    count('figures')
 
     # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
+    fig.suptitle('%s Well' % index.well, fontsize=14)
 
-    plt.savefig('%s Litho Validation' % df['Well'].iloc[0])
+    if not show:
+        return fig
 
-    plt.show()
-
-
-def lithoplot_test(df, well):
-    df = df[df['Well'] == well]
-
-    # lithofacies color map
-    litho_colors = ['mediumseagreen', 'orange', 'yellow', 'saddlebrown', 'grey', 'cyan']
-    cmap_litho = colors.ListedColormap(litho_colors)  # make color into colormap
-
-    cluster = np.repeat(np.expand_dims(df.Facies_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 5, figsize=(8, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c='g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(), df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c='r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c='black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c='blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # lithofacies
-    im = ax[4].imshow(cluster, interpolation='none', aspect='auto',
-                      cmap=cmap_litho, vmin=0, vmax=6)
-    ax[4].set_xlabel('Lithofacies')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[4])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((30 * ' ').join(['Si ', 'VSiS', 'SiSs',
-                                    'SiCl', 'Cl', 'SiSsCt']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
+    if spec['savefig']:
+        fig.savefig(spec['savefig'] % index.well, dpi=dpi or 'figure')
 
     plt.show()
+    # an interactive backend returns from show() at once, the figure stays open for the user
+    if not plt.isinteractive():
+        plt.close(fig)
 
 
-# electrofacies classifier plot
-def efplot_data(df, well):
-    df = df[df['Well'] == well]
-
-    # electrofacies color map
-    # color order = [0, 1, 2, 3]
-    ef_colors = ['red', 'green', 'blue', 'yellow', 'cyan'] 
-    cmap_ef = colors.ListedColormap(ef_colors) # make color into colormap
+def data_layout(column, target, label):
+    return layout([tops_spec()] + [curve_spec(c) for c in WELL_CURVES]
+                  + [class_spec(column, target, label)], (20, 12))
 
-    cluster = np.repeat(np.expand_dims(df.Electrofacies, 1), 100, 1)
 
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
+def val_layout(column, pred, target, actual_label, pred_label, savefig=None):
+    return layout([tops_spec()] + [curve_spec(c) for c in WELL_CURVES]
+                  + [class_spec(column, target, actual_label, colorbar=False),
+                     class_spec(pred, target, pred_label)], (20, 12), savefig)
 
-    # plotting
-    fig, ax = plt.subplots(1, 7, figsize = (20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
-  
-    # electrofacies
-    im = ax[6].imshow(cluster, interpolation='none', aspect='auto',
-                    cmap = cmap_ef, vmin=0, vmax=4)
-    ax[6].set_xlabel('Electrofacies')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[6])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((40*' ').join(['Cy', 'Fu', 'Be', 'SI', 'Sy']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
 
-    # title
-    fig.suptitle('%s Well'%df['Well'].iloc[0], fontsize = 14)
+def test_layout(column, target, label):
+    return layout([curve_spec(c) for c in TEST_CURVES]
+                  + [class_spec(column, target, label)], (8, 12))
 
-    plt.show()
 
+PRESETS = {
+    # lithofacies classifier plot
+    'lithoplot_data': data_layout('Facies', 'litho', 'Lithofacies'),
+    'lithoplot_val': val_layout('Facies', 'Facies_pred', 'litho', 'Actual Lithofacies',
+                                'Predicted Lithofacies', '%s Litho Validation'),
+    'lithoplot_test': test_layout('Facies_pred', 'litho', 'Lithofacies'),
 
-def efplot_val(df, well):
-    df = df[df['Well'] == well]
+    # electrofacies classifier plot
+    'efplot_data': data_layout('Electrofacies', 'ef', 'Electrofacies'),
+    'efplot_val': val_layout('Electrofacies', 'Ef_pred', 'ef', 'Actual Pattern',
+                             'Predicted Pattern', '%s Electrofacies Validation'),
+    'efplot_test': test_layout('Ef_pred', 'ef', 'Electrofacies'),
 
-    # electrofacies color map
-    ef_colors = ['red', 'green', 'blue', 'yellow', 'cyan'] 
-    cmap_ef = colors.ListedColormap(ef_colors) # make color into colormap
+    # deposition environment classifier plot
+    'envplot_data': data_layout('Environment', 'env', 'Environment'),
+    'envplot_val': val_layout('Environment', 'Env_pred', 'env', 'Environment',
+                              'Predicted Environment', '%s Depo Env Validation'),
+    'envplot_test': test_layout('Env_pred', 'env', 'Environment'),
 
-    cluster1 = np.repeat(np.expand_dims(df.Electrofacies, 1), 100, 1)
-    cluster2 = np.repeat(np.expand_dims(df.Ef_pred, 1), 100, 1)
+    # gas level plotting
+    'gasplot_data': test_layout('Gas', 'gas', 'Gas Level'),
+    'gasplot_val': layout([curve_spec(c) for c in TEST_CURVES]
+                          + [class_spec('Gas', 'gas', 'Actual Gas Level', colorbar=False),
+                             class_spec('Gas_pred', 'gas', 'Predicted Gas Level')], (12, 12)),
+    'gasplot_test': test_layout('Gas_pred', 'gas', 'Gas Level'),
+}
 
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
 
-    # plotting
-    fig, ax = plt.subplots(1, 8, figsize = (20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
-  
-    # actual pattern
-    im = ax[6].imshow(cluster1, interpolation='none', aspect='auto',
-                    cmap = cmap_ef, vmin=0, vmax=4)
-    ax[6].set_xlabel('Actual Pattern')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-    # predicted pattern
-    im = ax[7].imshow(cluster2, interpolation='none', aspect='auto',
-                    cmap = cmap_ef, vmin=0, vmax=4)
-    ax[7].set_xlabel('Predicted Pattern')
-    ax[7].xaxis.set_label_position('top')
-    ax[7].xaxis.set_ticks_position('top')
-    ax[7].set_xticks([])
-    ax[7].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[7])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((40*' ').join(['Cy', 'Fu', 'Be', 'SI', 'Sy']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
+# lithofacies classifier plot
+def lithoplot_data(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['lithoplot_data'], show, **kwargs)
 
-    # title
-    fig.suptitle('%s Well'%df['Well'].iloc[0], fontsize = 14)
 
-    plt.savefig('%s Electrofacies Validation' %df['Well'].iloc[0])
+def lithoplot_val(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['lithoplot_val'], show, **kwargs)
 
-    plt.show()
 
+def lithoplot_test(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['lithoplot_test'], show, **kwargs)
 
-def efplot_test(df, well):
-    df = df[df['Well'] == well]
 
-    # electrofacies color map
-    ef_colors = ['red', 'green', 'blue', 'yellow', 'cyan']  
-    cmap_ef = colors.ListedColormap(ef_colors) # make color into colormap
+# electrofacies classifier plot
+def efplot_data(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['efplot_data'], show, **kwargs)
 
-    cluster = np.repeat(np.expand_dims(df.Ef_pred, 1), 100, 1)
 
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
+def efplot_val(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['efplot_val'], show, **kwargs)
 
-    # plotting
-    fig, ax = plt.subplots(1, 5, figsize = (8, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c = 'g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(),df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c = 'r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(),df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c = 'black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(),df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c = 'blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(),df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-  
- 
-    # electrofacies
-    im = ax[4].imshow(cluster, interpolation='none', aspect='auto',
-                    cmap = cmap_ef, vmin=0, vmax=4)
-    ax[4].set_xlabel('Electrofacies')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-
-    # color bar
-    divider = make_axes_locatable(ax[4])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((40*' ').join(['Cy', 'Fu', 'Be', 'SI', 'Sy']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
 
-    # title
-    fig.suptitle('%s Well'%df['Well'].iloc[0], fontsize = 14)
+def efplot_test(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['efplot_test'], show, **kwargs)
 
-    plt.show()
 
-  
 # deposition environment classifier plot
-def envplot_data(df, well):
-    df = df[df['Well'] == well]
-
-    # deposition environment color map
-    # color order = [0, 1, 2, 3, ...]
-    env_colors = ['saddlebrown', 'yellowgreen', 'turquoise', 'darkgreen', 'grey', 'blue'] 
-    cmap_env = colors.ListedColormap(env_colors) # make color into colormap
-
-    cluster = np.repeat(np.expand_dims(df.Environment, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 7, figsize = (20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
-  
-    # deposition environment
-    im = ax[6].imshow(cluster, interpolation='none', aspect='auto',
-                    cmap = cmap_env, vmin=0, vmax=6)
-    ax[6].set_xlabel('Environment')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[6])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((30*' ').join(['MoS ', 'Sh', 'MI', 
-                                  'ImS', 'Ind', 'Ma']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well'%df['Well'].iloc[0], fontsize = 14)
-
-    plt.show()
+def envplot_data(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['envplot_data'], show, **kwargs)
 
 
-def envplot_val(df, well):
-    df = df[df['Well'] == well]
+def envplot_val(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['envplot_val'], show, **kwargs)
 
-    # deposition environment color map
-    env_colors = ['saddlebrown', 'yellowgreen', 'turquoise', 'darkgreen', 'grey', 'blue'] 
-    cmap_env = colors.ListedColormap(env_colors) # make color into colormap
 
-    cluster1 = np.repeat(np.expand_dims(df.Environment, 1), 100, 1)
-    cluster2 = np.repeat(np.expand_dims(df.Env_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 8, figsize = (20, 12))
-
-    # tops
-    fm_tops = dict(df[['Formation', 'Depth']].dropna().values.tolist())
-
-    ax[0].set_xlabel('Tops ', fontsize = '12' )
-    ax[0].set_ylabel('Measured Depth (m) ', fontsize = '12' )
-    ax[0].set_xticklabels([])
-    ax[0].set_xticks([])
-    ax[0].set_facecolor('#ffffed')
-    ax[0].set_ylim(df.Depth.min(), df.Depth.max())
-    ax[0].xaxis.set_label_position("top")
-    ax[0].invert_yaxis()
-    for Top in fm_tops.values() :
-        ax[0].axhline(y = float(Top), color = 'k', lw = 1, ls = '-',    
-                            alpha = 0.9, xmin = 0.06, xmax = 0.95 )
-    for Top, MD in fm_tops.items():
-        ax[0].text(x = 0.45,  y = float(MD), s = Top , fontsize = '9', 
-                horizontalalignment = 'center', verticalalignment = 'bottom')
-
-    # GR
-    ax[1].plot(df.GR, df.Depth, c='g')
-    ax[1].set_xlabel('Gamma Ray (API)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.GR.min(), df.GR.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # RHOB
-    ax[2].plot(df.RHOB, df.Depth, c='r')
-    ax[2].set_xlabel('Density (g/cc)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # NPHI
-    ax[3].plot(df.NPHI, df.Depth, c='black')
-    ax[3].set_xlabel('NPHI (.pu)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # DTCO
-    ax[4].plot(df.DTCO, df.Depth, c='blue')
-    ax[4].set_xlabel('DTCO (us/f)')
-    ax[4].set_ylim(top, bottom)
-    ax[4].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[4].grid()
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_yticklabels([])
-
-    # DTSM
-    ax[5].plot(df.DTSM, df.Depth, c='red')
-    ax[5].set_xlabel('DTSM (us/f)')
-    ax[5].set_ylim(top, bottom)
-    ax[5].set_xlim(df.DTSM.min(), df.DTSM.max())
-    ax[5].grid()
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_yticklabels([])
- 
-    # actual environment
-    im = ax[6].imshow(cluster1, interpolation='none', aspect='auto',
-                    cmap = cmap_env, vmin=0, vmax=6)
-    ax[6].set_xlabel('Environment')
-    ax[6].xaxis.set_label_position('top')
-    ax[6].xaxis.set_ticks_position('top')
-    ax[6].set_xticks([])
-    ax[6].set_yticklabels([])
-
-
-    # predicted environment
-    im = ax[7].imshow(cluster2, interpolation='none', aspect='auto',
-                    cmap = cmap_env, vmin=0, vmax=6)
-    ax[7].set_xlabel('Predicted Environment')
-    ax[7].xaxis.set_label_position('top')
-    ax[7].xaxis.set_ticks_position('top')
-    ax[7].set_xticks([])
-    ax[7].set_yticklabels([])
-
-
-    # color bar
-    divider = make_axes_locatable(ax[7])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((30*' ').join(['MoS ', 'Sh', 'MI',
-                                  'ImS', 'Ind', 'Ma']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well' %df['Well'].iloc[0], fontsize = 14)
-
-    fig.savefig('%s Depo Env Validation' %df['Well'].iloc[0])
-
-    plt.show()
-
-
-def envplot_test(df, well):
-    df = df[df['Well'] == well]
-
-    # deposition environment color map
-    env_colors = ['saddlebrown', 'yellowgreen', 'turquoise', 'darkgreen', 'grey', 'blue'] 
-    cmap_env = colors.ListedColormap(env_colors) # make color into colormap
-
-    cluster = np.repeat(np.expand_dims(df.Env_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 5, figsize = (8, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c = 'g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(),df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c = 'r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(),df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c = 'black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(),df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c = 'blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(),df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-  
- 
-    # deposition environment
-    im = ax[4].imshow(cluster, interpolation='none', aspect='auto',
-                    cmap = cmap_env, vmin=0, vmax=6)
-    ax[4].set_xlabel('Environment')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-
-    # color bar
-    divider = make_axes_locatable(ax[4])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax = cax)
-    cbar.set_label((30*' ').join(['MoS ', 'Sh', 'MI', 
-                                'ImS', 'Ind', 'Ma']))
-    cbar.set_ticks(range(0,1)); cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well'%df['Well'].iloc[0], fontsize = 14)
-
-    plt.show()
+def envplot_test(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['envplot_test'], show, **kwargs)
 
 
 # gas level plotting
-def gasplot_data(df, well):
-    df = df[df['Well'] == well]
-
-    # gas color map
-    # color order = [0, 1, 2, 3, ...]
-    gas_colors = ['blue', 'yellow']
-    cmap_gas = colors.ListedColormap(gas_colors)  # make color into colormap
-
-    cluster = np.repeat(np.expand_dims(df.Gas, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
+def gasplot_data(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['gasplot_data'], show, **kwargs)
 
-    # plotting
-    fig, ax = plt.subplots(1, 5, figsize=(8, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c='g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(), df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c='r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-     # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c='black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c='blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # lithology
-    im = ax[4].imshow(cluster, interpolation='none', aspect='auto',
-                      cmap=cmap_gas, vmin=0, vmax=1)
-    ax[4].set_xlabel('Gas Level')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[4])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((85 * ' ').join(['Low', 'Average']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
-
-    plt.show()
-
-
-def gasplot_val(df, well):
-    df = df[df['Well'] == well]
 
-    # gas color map
-    gas_colors = ['blue', 'yellow']
-    cmap_gas = colors.ListedColormap(gas_colors)  # make color into colormap
+def gasplot_val(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['gasplot_val'], show, **kwargs)
 
-    cluster1 = np.repeat(np.expand_dims(df.Gas, 1), 100, 1)
-    cluster2 = np.repeat(np.expand_dims(df.Gas_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 6, figsize=(12, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c='g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(), df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c='r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c='black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c='blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # actual gas level
-    im = ax[4].imshow(cluster1, interpolation='none', aspect='auto',
-                      cmap=cmap_gas, vmin=0, vmax=1)
-    ax[4].set_xlabel('Actual Gas Level')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-    # predicted gas level
-    im = ax[5].imshow(cluster2, interpolation='none', aspect='auto',
-                      cmap=cmap_gas, vmin=0, vmax=1)
-    ax[5].set_xlabel('Predicted Gas Level')
-    ax[5].xaxis.set_label_position('top')
-    ax[5].xaxis.set_ticks_position('top')
-    ax[5].set_xticks([])
-    ax[5].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[5])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((85 * ' ').join(['Low', 'Average']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
-
-    plt.show()
-
-
-def gasplot_test(df, well):
-    df = df[df['Well'] == well]
-
-    # gas color map
-    gas_colors = ['blue', 'yellow']
-    cmap_gas = colors.ListedColormap(gas_colors)  # make color into colormap
-
-    cluster = np.repeat(np.expand_dims(df.Gas_pred, 1), 100, 1)
-
-    # Set the top and bottom of depth
-    top = df['Depth'].max()
-    bottom = df['Depth'].min()
-
-    # plotting
-    fig, ax = plt.subplots(1, 5, figsize=(8, 12))
-
-    # GR
-    ax[0].plot(df.GR, df.Depth, c='g')
-    ax[0].set_ylabel('Depth (m)')
-    ax[0].set_xlabel('Gamma Ray (API)')
-    ax[0].set_ylim(top, bottom)
-    ax[0].set_xlim(df.GR.min(), df.GR.max())
-    ax[0].grid()
-    ax[0].xaxis.set_label_position('top')
-    ax[0].xaxis.set_ticks_position('top')
-
-    # RHOB
-    ax[1].plot(df.RHOB, df.Depth, c='r')
-    ax[1].set_xlabel('Density (g/cc)')
-    ax[1].set_ylim(top, bottom)
-    ax[1].set_xlim(df.RHOB.min(), df.RHOB.max())
-    ax[1].grid()
-    ax[1].xaxis.set_label_position('top')
-    ax[1].xaxis.set_ticks_position('top')
-    ax[1].set_yticklabels([])
-
-    # NPHI
-    ax[2].plot(df.NPHI, df.Depth, c='black')
-    ax[2].set_xlabel('NPHI (.pu)')
-    ax[2].set_ylim(top, bottom)
-    ax[2].set_xlim(df.NPHI.min(), df.NPHI.max())
-    ax[2].grid()
-    ax[2].xaxis.set_label_position('top')
-    ax[2].xaxis.set_ticks_position('top')
-    ax[2].set_yticklabels([])
-
-    # DTCO
-    ax[3].plot(df.DTCO, df.Depth, c='blue')
-    ax[3].set_xlabel('DTCO (us/f)')
-    ax[3].set_ylim(top, bottom)
-    ax[3].set_xlim(df.DTCO.min(), df.DTCO.max())
-    ax[3].grid()
-    ax[3].xaxis.set_label_position('top')
-    ax[3].xaxis.set_ticks_position('top')
-    ax[3].set_yticklabels([])
-
-    # gas level
-    im = ax[4].imshow(cluster, interpolation='none', aspect='auto',
-                      cmap=cmap_gas, vmin=0, vmax=1)
-    ax[4].set_xlabel('Gas Level')
-    ax[4].xaxis.set_label_position('top')
-    ax[4].xaxis.set_ticks_position('top')
-    ax[4].set_xticks([])
-    ax[4].set_yticklabels([])
-
-    # color bar
-    divider = make_axes_locatable(ax[4])
-    cax = divider.append_axes("right", size="20%", pad=0.05)
-    cbar = plt.colorbar(im, cax=cax)
-    cbar.set_label((85 * ' ').join(['Low', 'Average']))
-    cbar.set_ticks(range(0, 1));
-    cbar.set_ticklabels('')
-
-    # title
-    fig.suptitle('%s Well' % df['Well'].iloc[0], fontsize=14)
 
-    plt.show()
\ No newline at end of file
+def gasplot_test(df, well, show=True, **kwargs):
+    return plot_layout(df, well, PRESETS['gasplot_test'], show, **kwargs)
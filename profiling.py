@@ -0,0 +1,209 @@
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+
+# WELLPLOT_PROFILE=1 prints a summary at exit, a *.json value also writes a
+# Chrome trace there; add ,cprofile and/or ,memory for the heavier captures
+ENV = 'WELLPLOT_PROFILE'
+
+# the running profiler, None when profiling is off
+_active = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        stack.append(self)
+        self.children = 0.0
+        if self.profiler.memory:
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+        if self.profiler.memory:
+            self.args['memory_delta'] = tracemalloc.get_traced_memory()[0] - self.memory
+        self.profiler.events.append((self.name, self.start, duration, duration - self.children,
+                                     threading.get_ident(), self.args))
+        return False
+
+
+class Profiler:
+    def __init__(self, cprofile=False, memory=False):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.events = []
+        self.counters = defaultdict(int)
+        self.samples = []
+        self._local = threading.local()
+        self._profile = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        self.origin = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return self
+
+    def count(self, name, n):
+        self.counters[name] += n
+        self.samples.append((name, time.perf_counter(), self.counters[name]))
+
+    # one row per span name: calls, total and self time
+    def summary(self):
+        rows = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        for name, start, duration, own, tid, args in self.events:
+            row = rows[name]
+            row[0] += 1
+            row[1] += duration
+            row[2] += own
+            row[3] = max(row[3], duration)
+
+        table = pd.DataFrame([[name] + row for name, row in rows.items()],
+                             columns=['span', 'calls', 'total_s', 'self_s', 'max_s'])
+        table['mean_s'] = table['total_s'] / table['calls']
+        return table.sort_values('total_s', ascending=False).set_index('span')
+
+    def stats(self, sort='cumulative'):
+        if self._profile is None:
+            raise ValueError('profiler was started without cprofile=True')
+        return pstats.Stats(self._profile).sort_stats(sort)
+
+    # chrome://tracing / Perfetto JSON, spans as complete events, counters as counter events
+    def chrome_trace(self, path):
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6,
+                   'args': {k: v if isinstance(v, (int, float, str)) else str(v)
+                            for k, v in args.items()}}
+                  for name, start, duration, own, tid, args in self.events]
+        events += [{'name': name, 'ph': 'C', 'pid': pid, 'tid': 0,
+                    'ts': (t - self.origin) * 1e6, 'args': {name: value}}
+                   for name, t, value in self.samples]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        print(self.summary().to_string(float_format='%.4f'), file=file)
+        if self.counters:
+            print(', '.join('%s=%d' % item for item in self.counters.items()), file=file)
+        if self.memory and hasattr(self, 'peak_memory'):
+            print('peak traced memory %.1f MB' % (self.peak_memory / 1e6), file=file)
+
+
+# timing span, a shared no-op object when profiling is off
+def span(name, **args):
+    if _active is None:
+        return _NULL_SPAN
+    return _Span(_active, name, args)
+
+
+def count(name, n=1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+# decorator form of span
+def profiled(name):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _Span(_active, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enabled():
+    return _active is not None
+
+
+# profile a block: `with profile(trace='run.json') as p: ...; p.summary()`
+@contextmanager
+def profile(cprofile=False, memory=False, trace=None, report=False):
+    global _active
+    previous = _active
+    profiler = _active = Profiler(cprofile, memory).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = previous
+        if trace:
+            profiler.chrome_trace(trace)
+        if report:
+            profiler.report()
+
+
+def _from_environment():
+    global _active
+    options = [o.strip() for o in os.environ.get(ENV, '').split(',') if o.strip()]
+    if not options or options == ['0']:
+        return
+
+    trace = next((o for o in options if o.endswith('.json')), None)
+    profiler = _active = Profiler('cprofile' in options, 'memory' in options).start()
+
+    def finish():
+        profiler.stop()
+        if trace:
+            profiler.chrome_trace(trace)
+        profiler.report()
+        if profiler.cprofile:
+            profiler.stats().print_stats(25)
+
+    atexit.register(finish)
+
+
+_from_environment()
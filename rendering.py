@@ -0,0 +1,101 @@
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import plotfunc
+
+
+# peak resident memory of the process in bytes (ru_maxrss is KB on linux, bytes on macOS)
+def peak_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+# current resident memory in bytes, None where /proc is not available
+def current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+# figure outside the pyplot figure manager, drawn by its own Agg canvas
+def new_figure(figsize=None, dpi=100):
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+# drop the figure from pyplot if it is registered there and free its artists
+def close_figure(fig):
+    plt.close(fig)
+    fig.clear()
+
+
+# a figure that is released when the block ends, pyplot=True for notebooks
+@contextmanager
+def managed_figure(figsize=None, dpi=100, pyplot=False):
+    fig = plt.figure(figsize=figsize, dpi=dpi) if pyplot else new_figure(figsize, dpi)
+    try:
+        yield fig
+    finally:
+        close_figure(fig)
+
+
+# one figure per layout reused for every well: the axes are cleared and
+# redrawn instead of building a new figure each time
+class FigureRenderer:
+    def __init__(self, plot, dpi=100):
+        self.plot = plot
+        self.spec = plotfunc.PRESETS[plot] if isinstance(plot, str) else plot
+        self.dpi = dpi
+        self.fig = None
+
+    def draw(self, df, well):
+        if self.fig is None:
+            self.fig = new_figure(self.spec['figsize'], self.dpi)
+        return plotfunc.plot_layout(df, well, self.spec, show=False, dpi=self.dpi, fig=self.fig)
+
+    def save(self, df, well, path, fmt=None):
+        self.draw(df, well).savefig(path, format=fmt, dpi=self.dpi)
+        return path
+
+    def close(self):
+        if self.fig is not None:
+            close_figure(self.fig)
+            self.fig = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# render every well with one reused figure and record memory along the way
+# returns one row per well with seconds, current and peak RSS in MB
+def render_wells(df, plot, out_dir='.', fmt='png', dpi=100, wells=None):
+    os.makedirs(out_dir, exist_ok=True)
+    name = plot if isinstance(plot, str) else 'plot'
+
+    rows = []
+    with FigureRenderer(plot, dpi) as renderer:
+        for well, group in df.groupby('Well', sort=False):
+            if wells is not None and well not in wells:
+                continue
+            start = time.perf_counter()
+            path = renderer.save(group, well, os.path.join(out_dir, '%s_%s.%s' % (well, name, fmt)))
+            rss = current_rss()
+            rows.append({'Well': well, 'Path': path, 'Seconds': time.perf_counter() - start,
+                         'RSS_MB': rss / 1e6 if rss is not None else None,
+                         'Peak_RSS_MB': peak_rss() / 1e6})
+
+    return pd.DataFrame(rows)
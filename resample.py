@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+# class and zone columns, resampled by nearest sample or mode instead of interpolation
+LABEL_COLUMNS = ['Formation', 'Facies', 'Electrofacies', 'Environment', 'Gas',
+                 'Facies_pred', 'Ef_pred', 'Env_pred', 'Gas_pred']
+
+# spacing of the training CSVs
+TRAINING_STEP = 0.5
+
+
+# depths origin + k * step between top and base, k integer so that every
+# well resampled with the same step and origin lands on identical depths
+def depth_grid(top, base, step, origin=0.0):
+    if step <= 0:
+        raise ValueError('step must be positive, got %r' % step)
+    first = np.ceil((top - origin) / step - 1e-9)
+    last = np.floor((base - origin) / step + 1e-9)
+    return origin + np.arange(first, last + 1) * step
+
+
+# sample spacing of a depth column, median of the steps so that gaps do not count
+def sample_step(depth):
+    steps = np.diff(np.sort(np.asarray(depth, dtype=float)))
+    steps = steps[steps > 0]
+    return float(np.median(steps)) if len(steps) else np.nan
+
+
+# positions of every well's samples in depth order: one sorted depth array,
+# wells are contiguous segments of it and lookups are binary searches
+class DepthIndex:
+    def __init__(self, df):
+        codes, self.wells = pd.factorize(df['Well'], sort=False)
+        depth = df['Depth'].to_numpy(dtype=float)
+        self.order = np.lexsort((depth, codes))
+        self.depth = depth[self.order]
+
+        bounds = np.searchsorted(codes[self.order], np.arange(len(self.wells) + 1))
+        self.segments = {well: (bounds[i], bounds[i + 1]) for i, well in enumerate(self.wells)}
+
+    def __contains__(self, well):
+        return well in self.segments
+
+    def __len__(self):
+        return len(self.depth)
+
+    def _segment(self, well):
+        try:
+            return self.segments[well]
+        except KeyError:
+            raise KeyError('well %r is not in the index' % well) from None
+
+    def depths(self, well):
+        start, stop = self._segment(well)
+        return self.depth[start:stop]
+
+    # row positions (for df.iloc) of a well between top and base, in depth order
+    def rows(self, well, top=None, base=None):
+        start, stop = self._segment(well)
+        depth = self.depth[start:stop]
+        lo = 0 if top is None else np.searchsorted(depth, top, side='left')
+        hi = len(depth) if base is None else np.searchsorted(depth, base, side='right')
+        return self.order[start + lo:start + hi]
+
+    # row position of the closest sample of the well to every depth and its distance
+    def nearest(self, well, depths):
+        start, stop = self._segment(well)
+        depth = self.depth[start:stop]
+        depths = np.asarray(depths, dtype=float)
+        if len(depth) == 0:
+            return np.full(len(depths), -1), np.full(len(depths), np.inf)
+
+        right = np.clip(np.searchsorted(depth, depths), 1, len(depth) - 1) if len(depth) > 1 \
+            else np.zeros(len(depths), dtype=int)
+        left = np.maximum(right - 1, 0)
+        closest = np.where(np.abs(depth[left] - depths) <= np.abs(depth[right] - depths), left, right)
+
+        return self.order[start + closest], np.abs(depth[closest] - depths)
+
+
+def _interpolate(depth, values, grid, max_gap):
+    valid = ~np.isnan(values)
+    d, v = depth[valid], values[valid]
+    if len(d) == 0:
+        return np.full(len(grid), np.nan)
+
+    out = np.interp(grid, d, v, left=np.nan, right=np.nan)
+    # no straight lines across missing log sections
+    right = np.clip(np.searchsorted(d, grid), 1, max(len(d) - 1, 1))
+    gap = d[right] - d[right - 1] if len(d) > 1 else np.zeros(len(grid))
+    out[gap > max_gap] = np.nan
+
+    return out
+
+
+# class label of the closest sample, or the most frequent label of the samples in
+# each grid cell where there are any (mode); cells further than max_gap / 2 stay empty
+def _labels(depth, values, grid, step, max_gap, method):
+    codes, uniques = pd.factorize(values, sort=True)
+    uniques = np.asarray(uniques)
+    if len(depth) == 0 or len(uniques) == 0 or len(grid) == 0:
+        return np.full(len(grid), np.nan)
+
+    right = np.clip(np.searchsorted(depth, grid), 1, max(len(depth) - 1, 1)) if len(depth) > 1 \
+        else np.zeros(len(grid), dtype=int)
+    left = np.maximum(right - 1, 0)
+    closest = np.where(np.abs(depth[left] - grid) <= np.abs(depth[right] - grid), left, right)
+    out = codes[closest]
+    out[np.abs(depth[closest] - grid) > max_gap / 2] = -1
+
+    if method == 'mode':
+        cell = np.floor((depth - grid[0]) / step + 0.5).astype(np.int64)
+        keep = (codes >= 0) & (cell >= 0) & (cell < len(grid))
+        counts = np.bincount(cell[keep] * len(uniques) + codes[keep],
+                             minlength=len(grid) * len(uniques)).reshape(len(grid), len(uniques))
+        filled = counts.sum(axis=1) > 0
+        out[filled] = counts[filled].argmax(axis=1)
+    elif method != 'nearest':
+        raise ValueError("labels must be 'mode' or 'nearest', got %r" % method)
+
+    return np.where(out >= 0, uniques[np.maximum(out, 0)], np.nan)
+
+
+# one well on a regular depth grid: curves interpolated linearly, class columns
+# by mode or nearest sample; max_gap: longest stretch without data that is
+# bridged, by default twice the coarser of step and the input spacing
+def resample_well(df, step=TRAINING_STEP, top=None, base=None, origin=0.0,
+                  labels='mode', max_gap=None, label_columns=None):
+    df = df[df['Depth'].notna()]
+    if not df['Depth'].is_monotonic_increasing:
+        df = df.sort_values('Depth', kind='mergesort')
+    depth = df['Depth'].to_numpy(dtype=float)
+
+    grid = depth_grid(depth[0] if top is None else top, depth[-1] if base is None else base,
+                      step, origin) if len(depth) else np.empty(0)
+    if max_gap is None:
+        max_gap = 2 * np.nanmax([step, sample_step(depth)])
+
+    label_columns = LABEL_COLUMNS if label_columns is None else label_columns
+    out = {'Depth': grid}
+    for column in df.columns:
+        if column == 'Depth':
+            continue
+        if column == 'Well':
+            out[column] = df[column].iloc[0] if len(df) else None
+        elif column in label_columns or not pd.api.types.is_numeric_dtype(df[column]):
+            out[column] = _labels(depth, df[column].to_numpy(), grid, step, max_gap, labels)
+        else:
+            out[column] = _interpolate(depth, df[column].to_numpy(dtype=float), grid, max_gap)
+
+    return pd.DataFrame(out, columns=df.columns.insert(0, 'Depth').unique())
+
+
+# every well on the same regular grid, wells keep their own depth range
+def resample(df, step=TRAINING_STEP, origin=0.0, labels='mode', max_gap=None, label_columns=None):
+    wells = [resample_well(group, step, origin=origin, labels=labels, max_gap=max_gap,
+                           label_columns=label_columns)
+             for _, group in df.groupby('Well', sort=False)]
+    if not wells:
+        return df.iloc[:0]
+
+    return pd.concat(wells, ignore_index=True)
+
+
+# wells side by side on one depth index: columns (curve, well), rows the shared grid
+# over the union of the well ranges, NaN where a well has no data
+def align_wells(df, columns=None, step=TRAINING_STEP, origin=0.0, labels='mode', max_gap=None):
+    columns = columns or [c for c in df.columns if c not in ('Depth', 'Well')]
+    resampled = resample(df[['Depth', 'Well'] + list(columns)], step, origin, labels, max_gap)
+    wide = resampled.pivot(index='Depth', columns='Well', values=list(columns))
+
+    return wide.reindex(columns=pd.unique(df['Well']), level='Well')
+
+
+# values of the closest log sample at every sample depth, e.g. predictions at
+# core plug depths; samples further than tolerance from a log sample get NaN
+def merge_samples(samples, df, columns=None, tolerance=None, index=None):
+    index = index or DepthIndex(df)
+    columns = columns or [c for c in df.columns if c not in ('Depth', 'Well')]
+    merged = samples.copy()
+
+    rows = np.full(len(samples), -1)
+    distance = np.full(len(samples), np.inf)
+    for well, positions in samples.groupby('Well', sort=False).indices.items():
+        if well in index:
+            rows[positions], distance[positions] = index.nearest(
+                well, samples['Depth'].to_numpy(dtype=float)[positions])
+
+    found = rows >= 0
+    if tolerance is not None:
+        found &= distance <= tolerance
+    for column in columns:
+        values = df[column].to_numpy()[np.where(found, rows, 0)]
+        merged[column] = pd.Series(values, index=samples.index).where(found)
+    merged['Depth_offset'] = np.where(found, distance, np.nan)
+
+    return merged
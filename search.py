@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import f1_score
+from sklearn.model_selection import LeaveOneGroupOut, StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.pipeline import Pipeline
+
+from evaluation import tolerant_f1
+from knnindex import vote
+
+# same grid as jcopml gsp.knn_params
+KNN_PARAMS = {
+    'algo__n_neighbors': list(range(1, 31, 2)),
+    'algo__weights': ['uniform', 'distance'],
+    'algo__p': [1, 1.5, 2],
+}
+
+
+def f1_macro(y_true, y_pred):
+    return f1_score(y_true, y_pred, average='macro')
+
+
+# macro F1 that accepts a prediction one sample off a class boundary; the folds
+# have to be whole wells in depth order, i.e. cv='well'
+def f1_tolerant(y_true, y_pred):
+    return tolerant_f1(y_true, y_pred, tolerance=1)
+
+
+def _params(grid):
+    grid = {key.split('__')[-1]: list(values) for key, values in grid.items()}
+    grid.setdefault('n_neighbors', [5])
+    grid.setdefault('weights', ['uniform'])
+    grid.setdefault('p', [2])
+
+    return grid
+
+
+# train/test folds: 'well' leaves one well out, an int is stratified k-fold
+def splits(X, y, groups=None, cv='well'):
+    if cv == 'well':
+        if groups is None:
+            raise ValueError("cv='well' needs the Well column as groups")
+        return list(LeaveOneGroupOut().split(X, y, groups))
+
+    return list(StratifiedKFold(cv).split(X, y))
+
+
+def _fit_transform(prep, X_train, y_train, X_test):
+    prep = clone(prep).fit(X_train, y_train)
+    return prep.transform(X_train), prep.transform(X_test)
+
+
+# every grid point of one fold from a single neighbour query per p
+def _score_fold(fit_transform, prep, X, y, train, test, grid, scoring):
+    X_train, X_test = fit_transform(prep, X.iloc[train], y.iloc[train], X.iloc[test])
+    classes, y_train = np.unique(y.iloc[train], return_inverse=True)
+    y_test = y.iloc[test].to_numpy()
+
+    k_max = min(max(grid['n_neighbors']), len(train))
+    scores = {}
+    for p in grid['p']:
+        dist, ind = NearestNeighbors(n_neighbors=k_max, p=p).fit(X_train).kneighbors(X_test)
+        for k in grid['n_neighbors']:
+            for weights in grid['weights']:
+                pred = vote(dist[:, :k], ind[:, :k], y_train, len(classes), weights)
+                scores[k, weights, p] = scoring(y_test, classes[pred])
+
+    return scores
+
+
+class KNNSearch:
+    # prep: unfitted preprocessing (the ColumnTransformer of the notebooks)
+    # memory: joblib cache directory, fitted fold transforms are reused across searches
+    def __init__(self, prep, param_grid=None, cv='well', scoring=None, n_jobs=None,
+                 memory=None, refit=True):
+        self.prep = prep
+        self.param_grid = KNN_PARAMS if param_grid is None else param_grid
+        self.cv = cv
+        self.scoring = scoring or f1_macro
+        self.n_jobs = n_jobs
+        self.memory = memory
+        self.refit = refit
+
+    def fit(self, X, y, groups=None):
+        X = pd.DataFrame(X)
+        y = pd.Series(np.asarray(y), index=X.index)
+        grid = _params(self.param_grid)
+        folds = splits(X, y, groups, self.cv)
+
+        fit_transform = _fit_transform
+        if self.memory is not None:
+            fit_transform = Memory(self.memory, verbose=0).cache(_fit_transform)
+
+        fold_scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(_score_fold)(fit_transform, self.prep, X, y, train, test, grid, self.scoring)
+            for train, test in folds)
+
+        rows = []
+        for key in fold_scores[0]:
+            k, weights, p = key
+            row = {'param_algo__n_neighbors': k, 'param_algo__weights': weights, 'param_algo__p': p}
+            for i, scores in enumerate(fold_scores):
+                row['split%d_test_score' % i] = scores[key]
+            rows.append(row)
+
+        results = pd.DataFrame(rows)
+        split_scores = results.filter(like='_test_score')
+        results['mean_test_score'] = split_scores.mean(axis=1)
+        results['std_test_score'] = split_scores.std(axis=1, ddof=0)
+        results['rank_test_score'] = results['mean_test_score'].rank(
+            ascending=False, method='min').astype(int)
+
+        best = results['mean_test_score'].idxmax()
+        self.cv_results_ = results
+        self.best_score_ = results.loc[best, 'mean_test_score']
+        p = float(results.loc[best, 'param_algo__p'])
+        self.best_params_ = {'algo__n_neighbors': int(results.loc[best, 'param_algo__n_neighbors']),
+                             'algo__weights': str(results.loc[best, 'param_algo__weights']),
+                             'algo__p': int(p) if p.is_integer() else p}
+
+        if self.refit:
+            self.best_estimator_ = Pipeline([('prep', clone(self.prep)),
+                                             ('algo', KNeighborsClassifier())])
+            self.best_estimator_.set_params(**self.best_params_).fit(X, y)
+
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def score(self, X, y):
+        return self.scoring(np.asarray(y), self.predict(X))
@@ -0,0 +1,224 @@
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib import colors
+from matplotlib.collections import PolyCollection
+from matplotlib.transforms import Bbox
+
+import plotfunc
+from cleaning import LogCleaner
+from inference import MultiTargetPredictor
+
+
+class StreamingPredictor:
+    # max_batch bounds the work, and so the latency, of a single predict call
+    def __init__(self, models=None, cleaner=None, max_batch=512):
+        self.predictor = MultiTargetPredictor(models, cleaner)
+        self.cleaner = cleaner
+        self.max_batch = max_batch
+        self.last_depth = -np.inf
+        self.latencies = []
+
+    # one depth-ordered batch of samples in, the same rows with predictions out
+    def update(self, batch):
+        batch = batch[batch['Depth'] > self.last_depth]
+        if not len(batch):
+            return batch
+        if not batch['Depth'].is_monotonic_increasing:
+            raise ValueError('batch is not ordered by depth')
+
+        if self.cleaner is None:
+            # without training statistics only sentinels and physical ranges apply
+            self.cleaner = LogCleaner(spikes=None).fit(batch)
+
+        out = []
+        for start in range(0, len(batch), self.max_batch):
+            started = time.perf_counter()
+            part = self.cleaner.transform(batch.iloc[start:start + self.max_batch])
+            out.append(self.predictor.transform(part, clean=False))
+            self.latencies.append(time.perf_counter() - started)
+
+        self.last_depth = batch['Depth'].iloc[-1]
+        return pd.concat(out)
+
+    def run(self, batches):
+        for batch in batches:
+            result = self.update(batch)
+            if len(result):
+                yield result
+
+    # batches from an asyncio queue, None ends the stream
+    async def arun(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            result = await loop.run_in_executor(None, self.update, batch)
+            if len(result):
+                yield result
+
+
+# follow a csv that is being appended to, stand-in for a live LWD feed;
+# read as bytes so that the offsets stay file positions whatever the
+# encoding and line endings
+def tail_csv(path, poll=0.5, timeout=None, index_col=None, encoding='utf-8'):
+    header, position, idle = None, 0, 0.0
+    while timeout is None or idle < timeout:
+        if os.path.getsize(path) > position:
+            with open(path, 'rb') as f:
+                f.seek(position)
+                lines = f.readlines()
+            # only complete lines, a partial last line is read next time
+            if lines and not lines[-1].endswith(b'\n'):
+                lines = lines[:-1]
+            position += sum(len(line) for line in lines)
+            if header is None and lines:
+                header, lines = lines[0], lines[1:]
+            if lines:
+                idle = 0.0
+                yield pd.read_csv(io.BytesIO(header + b''.join(lines)), index_col=index_col,
+                                  encoding=encoding)
+                continue
+        time.sleep(poll)
+        idle += poll
+
+
+# append to a buffer that doubles when full, returns the buffer and the new length
+def _append(buffer, n, values):
+    if n + len(values) > len(buffer):
+        grown = np.empty(max(2 * len(buffer), n + len(values)), dtype=buffer.dtype)
+        grown[:n] = buffer[:n]
+        buffer = grown
+    buffer[n:n + len(values)] = values
+    return buffer, n + len(values)
+
+
+# *_test track plot that grows with every batch: one line per curve track and one
+# strip collection per class track are extended in place, and only the depth band
+# of the new batch is drawn and blitted. The depth axis is given headroom so that
+# a full redraw is needed only when the data outgrows the axis limits.
+class LiveTrackPlot:
+    def __init__(self, preset='efplot_test', headroom=100.0):
+        self.spec = plotfunc.PRESETS[preset] if isinstance(preset, str) else preset
+        self.headroom = headroom
+        self.fig = None
+        self.redraws = 0
+
+    def _start(self, batch):
+        tracks = self.spec['tracks']
+        self.fig = plotfunc.plot_layout(batch, batch['Well'].iloc[0], self.spec, show=False)
+        self.canvas = self.fig.canvas
+        self.axes = self.fig.axes[:len(tracks)]
+        self.top = batch['Depth'].iloc[0]
+        self.bottom = self.top + self.headroom
+        self.n = 0
+        self.depth = np.empty(1024)
+
+        # the artists of plot_layout hold all the data, the animated ones the new band
+        self.curves, self.classes = [], []
+        for track, axis in zip(tracks, self.axes):
+            if track['kind'] == 'curve':
+                segment, = axis.plot([], [], c=track['color'], animated=True)
+                self.curves.append({'axis': axis, 'line': axis.lines[0], 'segment': segment,
+                                    'column': track['column'], 'values': np.empty(1024),
+                                    'xlim': list(axis.get_xlim())})
+            elif track['kind'] == 'class':
+                target = plotfunc.CLASSES[track['target']]
+                segment = axis.add_collection(PolyCollection([], edgecolors='none', antialiaseds=False,
+                                                             animated=True))
+                self.classes.append({'axis': axis, 'strips': axis.collections[0], 'segment': segment,
+                                     'column': track['column'], 'cmap': target['cmap'],
+                                     'norm': colors.Normalize(0, target['vmax']),
+                                     'top': np.empty(0), 'base': np.empty(0), 'values': np.empty(0)})
+
+    # class runs of the new samples; joined: depth and labels start with the previous
+    # last sample, whose run is extended instead of starting a new one
+    # returns the index of the first run that changed
+    def _merge_runs(self, track, depth, labels, joined):
+        top, base, values = plotfunc.class_runs(depth, labels)
+        first = 0
+        if joined:
+            track['base'][-1] = base[0]
+            top, base, values = top[1:], base[1:], values[1:]
+            first = len(track['top']) - 1
+        track['top'] = np.r_[track['top'], top]
+        track['base'] = np.r_[track['base'], base]
+        track['values'] = np.r_[track['values'], values]
+        return first
+
+    def _set_strips(self, collection, track, first=0):
+        values = track['values'][first:]
+        keep = ~np.isnan(values)
+        collection.set_verts(plotfunc.strip_verts(track['top'][first:][keep], track['base'][first:][keep]))
+        collection.set_facecolors(track['cmap'](track['norm'](values[keep])))
+
+    def update(self, batch):
+        if not len(batch):
+            return self.fig
+        started = self.fig is None
+        if started:
+            self._start(batch)
+
+        # the band runs from the previous last sample on, so the new segment joins the old one
+        joined = self.n > 0
+        prev = self.n - 1 if joined else 0
+        n_old = self.n
+        self.depth, self.n = _append(self.depth, self.n, batch['Depth'].to_numpy(dtype=float))
+        depth = self.depth[:self.n]
+        full = started or depth[-1] > self.bottom
+
+        for curve in self.curves:
+            curve['values'], _ = _append(curve['values'], n_old, batch[curve['column']].to_numpy(dtype=float))
+            values = curve['values'][:self.n]
+            curve['line'].set_data(values, depth)
+            curve['segment'].set_data(values[prev:], depth[prev:])
+            lo, hi = curve['xlim']
+            new_lo = np.fmin.reduce(values[prev:], initial=lo)
+            new_hi = np.fmax.reduce(values[prev:], initial=hi)
+            if new_lo < lo or new_hi > hi:
+                # a 10% margin so that a slowly drifting curve does not redraw every batch
+                pad = 0.1 * (new_hi - new_lo)
+                curve['xlim'] = [new_lo - pad if new_lo < lo else lo, new_hi + pad if new_hi > hi else hi]
+                curve['axis'].set_xlim(*curve['xlim'])
+                full = True
+
+        for track in self.classes:
+            labels = batch[track['column']].to_numpy(dtype=float)
+            if joined:
+                labels = np.r_[track['values'][-1], labels]
+            first = self._merge_runs(track, depth[prev:], labels, joined)
+            self._set_strips(track['strips'], track)
+            self._set_strips(track['segment'], track, first)
+
+        if full or not self.canvas.supports_blit:
+            # depth axis extended by its current length or the headroom, whichever is more
+            self.bottom = max(self.bottom, depth[-1] + max(self.headroom, depth[-1] - self.top))
+            for axis in self.axes:
+                axis.set_ylim(self.bottom, self.top)
+            self.redraws += 1
+            self.canvas.draw()
+            return self.fig
+
+        # draw the new band over the current frame and blit just that band; the
+        # frame goes over the data like in a full draw, both clipped to the band
+        y0, y1 = self.axes[0].transData.transform([(0, depth[prev]), (0, depth[-1])])[:, 1]
+        band = Bbox.from_extents(self.fig.bbox.x0, min(y0, y1) - 2, self.fig.bbox.x1, max(y0, y1) + 2)
+        for track in self.curves + self.classes:
+            axis = track['axis']
+            track['segment'].set_clip_box(Bbox.intersection(band, axis.bbox))
+            axis.draw_artist(track['segment'])
+            for spine in axis.spines.values():
+                clip_on, clip_box = spine.get_clip_on(), spine.get_clip_box()
+                spine.set_clip_box(band)
+                spine.set_clip_on(True)
+                axis.draw_artist(spine)
+                spine.set_clip_on(clip_on)
+                spine.set_clip_box(clip_box)
+        self.canvas.blit(band)
+
+        return self.fig
@@ -0,0 +1,189 @@
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import colors, rcParams
+from matplotlib.collections import LineCollection
+
+from lod import WellPyramids
+from plotfunc import CLASSES, PRESETS, class_runs, pixel_runs, plot_layout, strip_verts
+
+
+# interactive scrolling over a track plot: the static part of the figure is
+# cached once and every frame only redraws the data artists and depth axes
+class WellViewer:
+    def __init__(self, df, well, preset='efplot_val', window=None, step=0.1):
+        self.spec = PRESETS[preset] if isinstance(preset, str) else preset
+        df = df[df['Well'] == well].sort_values('Depth')
+        tracks = self.spec['tracks']
+
+        self.fig = plot_layout(df, well, self.spec, show=False)
+        self.canvas = self.fig.canvas
+        self.axes = self.fig.axes[:len(tracks)]
+        self.depth = df['Depth'].to_numpy(dtype=np.float64)
+        self.step = step
+
+        # the depth axis is the slow part of a frame: its tick labels become a
+        # pool of animated texts and every curve track gets its grid from a line collection
+        self.depth_axis = next(ax for track, ax in zip(tracks, self.axes) if track['kind'] != 'class')
+        self.canvas.draw()
+        label = self.depth_axis.yaxis.label
+        x = self.depth_axis.transAxes.inverted().transform(label.get_window_extent().p1)[0]
+        self.depth_axis.yaxis.set_label_coords(x, 0.5)
+        self.locator = self.depth_axis.yaxis.get_major_locator()
+        self.ticks = [self.depth_axis.text(-0.03, 0, '', ha='right', va='center', clip_on=False,
+                                           fontsize=rcParams['ytick.labelsize'],
+                                           transform=self.depth_axis.get_yaxis_transform())
+                      for _ in range(16)]
+
+        self.curves = []
+        self.classes = []
+        self.grids = []
+        self.labels = []
+        self.cursors = []
+        self.artists = []
+        for track, ax in zip(tracks, self.axes):
+            if track['kind'] == 'curve':
+                self.curves.append((ax, ax.lines[0], track['column']))
+                grid = LineCollection([], colors=rcParams['grid.color'], alpha=rcParams['grid.alpha'],
+                                      linewidths=rcParams['grid.linewidth'],
+                                      transform=ax.get_yaxis_transform())
+                self.grids.append(ax.add_collection(grid))
+            elif track['kind'] == 'class':
+                top, base, values = class_runs(self.depth, df[track['column']])
+                keep = ~np.isnan(values)
+                target = CLASSES[track['target']]
+                self.classes.append((ax, ax.collections[0], target['cmap'], colors.Normalize(0, target['vmax']),
+                                     top[keep], base[keep], values[keep]))
+            for text in ax.texts:
+                if text not in self.ticks:
+                    text.set_clip_on(True)
+                    self.labels.append(text)
+            ax.set_yticks([])
+            self.cursors.append(ax.axhline(self.depth[0], color='k', lw=0.8, ls='--', visible=False))
+            self.artists.append((ax, ax.collections + ax.lines + ax.texts))
+
+        self.lod = WellPyramids(df, [column for ax, line, column in self.curves])
+
+        self.readout = self.fig.text(0.5, 0.935, '', ha='center', fontsize=10)
+        for ax, artists in self.artists:
+            for artist in artists:
+                artist.set_animated(True)
+        self.readout.set_animated(True)
+
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('key_press_event', self._on_key)
+        self.canvas.mpl_connect('motion_notify_event', self._on_move)
+
+        self.top, self.base = window or (self.depth[0], self.depth[-1])
+        self.set_view(self.top, self.base)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for ax, artists in self.artists:
+            for artist in artists:
+                ax.draw_artist(artist)
+        self.fig.draw_artist(self.readout)
+
+    def _blit(self):
+        if self.background is None:
+            # first frame, the draw event caches the background
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    # data artists cut down to what the view can show
+    def _decimate(self):
+        for ax, line, column in self.curves:
+            pixels = max(int(ax.get_window_extent().height), 1)
+            line.set_data(*self.lod.query(column, self.top, self.base, pixels)[::-1])
+
+        # runs thinner than a pixel are replaced by the run under each pixel centre
+        for ax, strips, cmap, norm, top, base, values in self.classes:
+            pixels = max(int(ax.get_window_extent().height), 1)
+            top, base, values = pixel_runs(top, base, values, self.top, self.base, pixels)
+            strips.set_verts(strip_verts(top, base))
+            strips.set_facecolors(cmap(norm(values)))
+
+        # formation names outside the view cost as much to draw as visible ones
+        for text in self.labels:
+            text.set_visible(self.top <= text.get_position()[1] <= self.base)
+
+        ticks = self.locator.tick_values(self.top, self.base)
+        ticks = ticks[(ticks >= self.top) & (ticks <= self.base)][:len(self.ticks)]
+        for i, text in enumerate(self.ticks):
+            text.set_visible(i < len(ticks))
+            if i < len(ticks):
+                text.set_y(ticks[i])
+                text.set_text('%g' % ticks[i])
+        for grid in self.grids:
+            grid.set_segments([[(0, y), (1, y)] for y in ticks])
+
+    def set_view(self, top, base):
+        span = base - top
+        top = min(max(top, self.depth[0]), max(self.depth[-1] - span, self.depth[0]))
+        self.top, self.base = top, min(top + span, self.depth[-1])
+
+        for ax in self.axes:
+            ax.set_ylim(self.base, self.top)
+        self._decimate()
+        self.readout.set_text('%.1f - %.1f m' % (self.top, self.base))
+        self._blit()
+
+    def scroll(self, fraction):
+        shift = fraction * (self.base - self.top)
+        self.set_view(self.top + shift, self.base + shift)
+
+    def zoom(self, factor):
+        centre, half = (self.top + self.base) / 2, (self.base - self.top) * factor / 2
+        self.set_view(centre - half, centre + half)
+
+    def _on_scroll(self, event):
+        self.scroll(self.step if event.button == 'down' else -self.step)
+
+    def _on_key(self, event):
+        if event.key in ('down', 'pagedown'):
+            self.scroll(self.step if event.key == 'down' else 1.0)
+        elif event.key in ('up', 'pageup'):
+            self.scroll(-self.step if event.key == 'up' else -1.0)
+        elif event.key in ('+', '='):
+            self.zoom(0.5)
+        elif event.key == '-':
+            self.zoom(2.0)
+        elif event.key == 'home':
+            self.set_view(self.depth[0], self.depth[-1])
+
+    def _on_move(self, event):
+        inside = event.inaxes in self.axes and event.ydata is not None
+        for cursor in self.cursors:
+            cursor.set_visible(inside)
+            if inside:
+                cursor.set_ydata([event.ydata, event.ydata])
+        text = '%.1f - %.1f m' % (self.top, self.base)
+        if inside:
+            text += '    depth %.2f m' % event.ydata
+        self.readout.set_text(text)
+        self._blit()
+
+    # frames per second of scrolling a window through the whole well
+    def fps(self, window=100.0, frames=100):
+        self.set_view(self.depth[0], self.depth[0] + window)
+        step = (self.depth[-1] - self.depth[0] - window) / frames
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.set_view(self.top + step, self.base + step)
+        return frames / (time.perf_counter() - start)
+
+
+def view_well(df, well, preset='efplot_val', window=None):
+    viewer = WellViewer(df, well, preset, window)
+    plt.show()
+
+    return viewer
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from wellstats import axis_limits, curve_stats, log_curves, well_stats
+
+
+# formation intervals, one row per run of the Formation column in every well
+def formation_intervals(df):
+    df = df.dropna(subset=['Formation'])
+    if not df['Depth'].is_monotonic_increasing:
+        df = df.sort_values(['Well', 'Depth'], kind='mergesort')
+
+    well = df['Well'].to_numpy()
+    formation = df['Formation'].to_numpy()
+    depth = df['Depth'].to_numpy(dtype=float)
+    if len(depth) == 0:
+        return pd.DataFrame(columns=['Well', 'Formation', 'Top', 'Base'])
+
+    # a new interval starts where the formation or the well changes
+    change = (formation[1:] != formation[:-1]) | (well[1:] != well[:-1])
+    starts = np.flatnonzero(np.r_[True, change])
+    stops = np.r_[starts[1:], len(depth)]
+
+    return pd.DataFrame({'Well': well[starts],
+                         'Formation': formation[starts],
+                         'Top': depth[starts],
+                         'Base': depth[stops - 1]})
+
+
+# intervals of one well overlapping a depth range
+def formations_between(intervals, well, top, base):
+    intervals = intervals[intervals['Well'] == well]
+    return intervals[(intervals['Base'] >= top) & (intervals['Top'] <= base)]
+
+
+# formation name at a depth, binary search over the interval tops
+def formation_at(intervals, well, depth):
+    intervals = intervals[intervals['Well'] == well]
+    i = np.searchsorted(intervals['Top'].to_numpy(), depth, side='right') - 1
+    if i < 0 or depth > intervals['Base'].iloc[i]:
+        return None
+
+    return intervals['Formation'].iloc[i]
+
+
+# one well sorted by depth with its depth range, curve statistics and formation
+# intervals computed once; windows are row slices of it and share the rest
+# version: data version for the statistics cache (see wellstats.StatsCache), without
+# one only min/max are scanned and percentiles are computed on the first robust query
+# curves: the curves to keep statistics of, by default the log curves of df
+class WellIndex:
+    def __init__(self, df, well=None, version=None, curves=None):
+        if well is not None:
+            df = df[df['Well'] == well]
+        elif df['Well'].nunique() > 1:
+            raise ValueError('a WellIndex holds one well, give well= to pick one of %s'
+                             % list(df['Well'].unique()))
+        if not df['Depth'].is_monotonic_increasing:
+            df = df.sort_values('Depth', kind='mergesort')
+
+        self.source, self.start = df, 0
+        self.well = df['Well'].iloc[0] if len(df) else well
+        self.depth = df['Depth'].to_numpy(dtype=float)
+        self.curves = log_curves(df) if curves is None else [c for c in curves if c in df]
+        # shared with the windows, so the statistics are computed at most once
+        self.memo = {}
+        if version is not None:
+            stats = self.memo['stats'] = well_stats(df, self.well, version, self.curves)
+        else:
+            stats = curve_stats(df, self.curves, percentiles=())
+        self.limits = axis_limits(stats, self.curves)
+        self.well_intervals = formation_intervals(df) if 'Formation' in df else None
+
+    def _view(self, lo, hi):
+        view = object.__new__(WellIndex)
+        view.source, view.start = self.source, self.start + lo
+        view.well = self.well
+        view.depth = self.depth[lo:hi]
+        view.curves = self.curves
+        view.memo = self.memo
+        view.limits = self.limits
+        view.well_intervals = self.well_intervals
+        return view
+
+    # rows of the well frame in the depth range, sliced on first use
+    @property
+    def frame(self):
+        return self.source.iloc[self.start:self.start + len(self.depth)]
+
+    # formation intervals inside the depth range, cut at its ends
+    @property
+    def intervals(self):
+        if self.well_intervals is None or len(self.depth) == 0:
+            return self.well_intervals
+        top, base = self.depth[0], self.depth[-1]
+        intervals = self.well_intervals
+        if top > intervals['Top'].iloc[0] or base < intervals['Base'].iloc[-1]:
+            intervals = formations_between(intervals, self.well, top, base).assign(
+                Top=lambda t: t['Top'].clip(lower=top), Base=lambda t: t['Base'].clip(upper=base))
+        return intervals
+
+    def __len__(self):
+        return len(self.depth)
+
+    # statistics of the whole well
+    @property
+    def stats(self):
+        if 'stats' not in self.memo:
+            self.memo['stats'] = curve_stats(self.source, self.curves)
+        return self.memo['stats']
+
+    # axis limits of the whole well, robust=True for the 1st to 99th percentile
+    def curve_limits(self, curves=None, robust=False):
+        curves = self.curves if curves is None else list(curves)
+        if not robust:
+            return self.limits[curves]
+        return axis_limits(self.stats, curves, robust)
+
+    @property
+    def top(self):
+        return self.depth[0] if len(self.depth) else np.nan
+
+    @property
+    def base(self):
+        return self.depth[-1] if len(self.depth) else np.nan
+
+    # samples between top and base, a slice of the well frame without a copy
+    def window(self, top=None, base=None):
+        lo = 0 if top is None else np.searchsorted(self.depth, top, side='left')
+        hi = len(self.depth) if base is None else np.searchsorted(self.depth, base, side='right')
+        return self._view(lo, hi)
+
+    # samples from the first top to the last base of a formation
+    def formation(self, name):
+        intervals = self.intervals
+        if intervals is None:
+            raise KeyError('well %r has no Formation column' % self.well)
+        match = intervals[intervals['Formation'] == name]
+        if match.empty:
+            raise KeyError('formation %r is not in well %r, expected one of %s'
+                           % (name, self.well, list(intervals['Formation'].unique())))
+        return self.window(match['Top'].min(), match['Base'].max())
+
+    def formation_at(self, depth):
+        if self.well_intervals is None:
+            return None
+        return formation_at(self.well_intervals, self.well, depth)
+
+
+# one WellIndex per well from a single groupby
+def index_wells(df, version=None, curves=None):
+    return {well: WellIndex(group, version=version, curves=curves)
+            for well, group in df.groupby('Well', sort=False)}
@@ -0,0 +1,139 @@
+import hashlib
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from cleaning import BOUNDS
+
+# percentiles kept for every curve
+PERCENTILES = (0.5, 1, 2.5, 5, 25, 50, 75, 95, 97.5, 99, 99.5)
+
+# percentile range of robust=True axis limits
+ROBUST = (1, 99)
+
+
+def _percentile_column(q):
+    return 'p%g' % q
+
+
+# log curves of df, label and prediction columns have no axis to scale
+def log_curves(df):
+    return [c for c in BOUNDS if c in df]
+
+
+# count, NaN count, min, max and percentiles of every column from one sort,
+# NaNs sort to the end so the valid values of a column are its first n rows;
+# without percentiles only min and max are taken, no sort
+def curve_stats(df, curves=None, percentiles=PERCENTILES):
+    if curves is None:
+        curves = log_curves(df)
+    X = df[curves].to_numpy(dtype=float)
+    if not len(percentiles) and len(X):
+        nan = np.isnan(X).sum(axis=0)
+        # an all-NaN curve gets NaN limits
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return pd.DataFrame({'count': len(X) - nan, 'nan': nan,
+                                 'min': np.nanmin(X, axis=0), 'max': np.nanmax(X, axis=0)}, index=curves)
+    X = np.sort(X, axis=0)
+    nan = np.isnan(X).sum(axis=0)
+    n = len(X) - nan
+
+    stats = {'count': n, 'nan': nan}
+    if len(X) == 0:
+        for column in ['min', 'max'] + [_percentile_column(q) for q in percentiles]:
+            stats[column] = np.full(len(curves), np.nan)
+        return pd.DataFrame(stats, index=curves)
+
+    cols = np.arange(len(curves))
+    last = np.maximum(n - 1, 0)
+    empty = n == 0
+    stats['min'] = np.where(empty, np.nan, X[0, cols])
+    stats['max'] = np.where(empty, np.nan, X[last, cols])
+
+    # linear interpolation between the closest ranks, like np.percentile
+    for q in percentiles:
+        rank = last * q / 100.0
+        lo = np.floor(rank).astype(int)
+        hi = np.minimum(lo + 1, last)
+        value = X[lo, cols] + (X[hi, cols] - X[lo, cols]) * (rank - lo)
+        stats[_percentile_column(q)] = np.where(empty, np.nan, value)
+
+    return pd.DataFrame(stats, index=curves)
+
+
+# content hash of the columns the statistics are computed from, any edit of a
+# value gives a new version (same hashing as export.plot_key); it reads every
+# value, so it is the opt-in version='hash' of the cache, not the default
+def data_version(df, curves=None):
+    curves = log_curves(df) if curves is None else list(curves)
+    h = hashlib.sha1(pd.util.hash_pandas_object(df[curves], index=False).to_numpy().tobytes())
+    h.update(repr(curves).encode())
+    return h.hexdigest()
+
+
+# curve statistics by (well, data version, curves), least recently used entries
+# dropped first; the version is a token the owner of the data changes with it,
+# e.g. LogStore.version, so a lookup does not read the data
+class StatsCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # statistics of the rows of df; version identifies the data they come from,
+    # 'hash' for data_version(df), None computes them without caching
+    def get(self, df, well=None, version=None, curves=None):
+        curves = log_curves(df) if curves is None else list(curves)
+        if version is None:
+            return curve_stats(df, curves)
+        if version == 'hash':
+            version = data_version(df, curves)
+        key = (well, version, tuple(curves))
+        stats = self.entries.get(key)
+        if stats is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return stats
+
+        self.misses += 1
+        stats = self.entries[key] = curve_stats(df, curves)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return stats
+
+    def invalidate(self, well=None):
+        if well is None:
+            self.entries.clear()
+        else:
+            for key in [k for k in self.entries if k[0] == well]:
+                del self.entries[key]
+
+
+# shared by the plot functions
+STATS = StatsCache()
+
+
+def well_stats(df, well=None, version=None, curves=None):
+    return STATS.get(df, well, version, curves)
+
+
+# axis limits of curves as rows min/max, the full range or a percentile range
+# robust: True for ROBUST, or a (low, high) pair of PERCENTILES
+def axis_limits(stats, curves, robust=False):
+    if not robust:
+        columns = ['min', 'max']
+    else:
+        low, high = ROBUST if robust is True else robust
+        columns = [_percentile_column(low), _percentile_column(high)]
+        missing = [c for c in columns if c not in stats]
+        if missing:
+            raise ValueError('percentiles %s are not kept, use two of %s' % (missing, list(PERCENTILES)))
+
+    return pd.DataFrame(stats.loc[curves, columns].to_numpy().T, index=['min', 'max'], columns=curves)